@@ -1,14 +1,79 @@
 from ipaddress import IPv4Interface, IPv6Interface, ip_interface, ip_network, ip_address
-from re import fullmatch
-from logging import getLogger
-from os.path import isdir, isfile, join
-from copy import deepcopy
+from re import compile as re_compile
+from logging import getLogger, ERROR
+from os.path import exists, join
+from copy import copy
+from functools import lru_cache
+from typing import List
 
 from vnet_manager.utils.mac import random_mac_generator
 from vnet_manager.conf import settings
 
 logger = getLogger(__name__)
 
+# Returned by dict.get() for config items that are not present, a single lookup tells missing and present items apart
+_MISSING = object()
+
+# From: https://stackoverflow.com/a/7629690/8632038
+_MAC_RE = re_compile(r"([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}")
+
+
+def _cached_parser(parser):
+    """
+    Wraps an ipaddress parser in a LRU cache, configs tend to repeat the same addresses and networks
+    Unhashable values (a list or dict due to a typo in the config) bypass the cache so the parser can reject them
+    The cache is typed, equal values of a different type (True and 1.0) are not all accepted by the parser
+    :param parser: The ipaddress function or class to wrap
+    :return: function: The cached parser
+    """
+    cached = lru_cache(maxsize=1024, typed=True)(parser)
+
+    def parse(value):
+        try:
+            return cached(value)
+        except TypeError:
+            return parser(value)
+
+    return parse
+
+
+def _is_plain_ipv4_interface(value) -> bool:
+    """
+    Cheap check for the common 'a.b.c.d' and 'a.b.c.d/prefix' notation, without building any ipaddress objects
+    Only returns True for values IPv4Interface accepts, anything else (netmask notation, leading zeros etc.) returns False
+    :param value: The value to check
+    :return: bool: True if the value is a valid IPv4 interface in plain notation, False if unsure
+    """
+    if not isinstance(value, str):
+        return False
+    host, sep, prefix = value.partition("/")
+    octets = host.split(".")
+    if len(octets) != 4:
+        return False
+    for octet in octets:
+        if not (octet.isascii() and octet.isdigit()) or len(octet) > 3 or (len(octet) > 1 and octet[0] == "0") or int(octet) > 255:
+            return False
+    if sep and not (prefix.isascii() and prefix.isdigit() and (len(prefix) == 1 or prefix[0] != "0") and int(prefix) <= 32):
+        return False
+    return True
+
+
+def _parse_ipv4_interface(value):
+    """
+    Validates an IPv4 interface, values in plain notation skip the ipaddress parser
+    :param value: The value to validate
+    :raise ValueError: If the value is not a valid IPv4 interface
+    """
+    if not _is_plain_ipv4_interface(value):
+        IPv4Interface(value)
+
+
+_ipv4_interface = _cached_parser(_parse_ipv4_interface)
+_ipv6_interface = _cached_parser(IPv6Interface)
+_ip_interface = _cached_parser(ip_interface)
+_ip_network = _cached_parser(ip_network)
+_ip_address = _cached_parser(ip_address)
+
 
 class ValidateConfig:
     """
@@ -19,15 +84,20 @@ class ValidateConfig:
         """
         :param dict config: The config generated by get_config()
         """
-        self._all_ok = True
         self._validators_ran = 0
-        self._new_config = deepcopy(config)
+        # The updated config shares all unchanged items with the passed config, see _cow()
+        self._new_config = config
+        self._copied = set()
+        # Errors are collected as (msg, args) and logged when all validators have run, see validate()
+        # The config is OK as long as no errors have been found
+        self._errors = []
+        self._supported_machine_types = frozenset(settings.SUPPORTED_MACHINE_TYPES)
         self.default_message = ". Please check your settings"
         self.config = config
 
     def __str__(self) -> str:
         return (
-            f"VNet config validator, current_state: {'OK' if self._all_ok else 'NOT OK'}, "
+            f"VNet config validator, current_state: {'OK' if self.config_validation_successful else 'NOT OK'}, "
             f"amount of validators run: {self.validators_ran}"
         )
 
@@ -36,7 +106,7 @@ class ValidateConfig:
         """
         This property can be called to see if any unrecoverable errors in the config have been found
         """
-        return self._all_ok
+        return not self._errors
 
     @property
     def updated_config(self) -> dict:
@@ -45,6 +115,13 @@ class ValidateConfig:
         """
         return self._new_config
 
+    @property
+    def errors(self) -> List[str]:
+        """
+        Return the config errors that have been found so far
+        """
+        return [msg % args for msg, args in self._errors]
+
     @property
     def validators_ran(self) -> int:
         """
@@ -52,15 +129,46 @@ class ValidateConfig:
         """
         return self._validators_ran
 
+    def _cow(self, *path) -> dict:
+        """
+        Copy-on-write the items along a path in the updated config, so the passed config is never mutated
+        Every dict or list is (shallow) copied only once, the first time something below it is updated
+        :param path: The keys/indexes to walk from the root of the updated config
+        :return: dict: The (copied) item at the end of the path, safe to update
+        """
+        if id(self._new_config) not in self._copied:
+            self._new_config = copy(self._new_config)
+            self._copied.add(id(self._new_config))
+        item = self._new_config
+        for key in path:
+            child = item[key]
+            if id(child) not in self._copied:
+                child = copy(child)
+                item[key] = child
+                self._copied.add(id(child))
+            item = child
+        return item
+
+    def _error(self, msg: str, *args):
+        """
+        Record a config error, this marks the config as not OK
+        :param str msg: The error message, formatted with args when it is logged
+        :param args: The arguments for the error message
+        """
+        self._errors.append((msg, args))
+
     def validate(self):
         """
-        Run all validation functions
+        Run all validation functions and log the errors found
         """
-        self._all_ok = True
+        self._errors = []
         self.validate_switch_config()
         self.validate_machine_config()
         if "veths" in self.config:
             self.validate_veth_config()
+        if logger.isEnabledFor(ERROR):
+            for msg, args in self._errors:
+                logger.error(msg, *args)
 
     def validate_switch_config(self):
         """
@@ -68,131 +176,163 @@ class ValidateConfig:
         """
         self._validators_ran += 1
         if "switches" not in self.config:
-            logger.error(f"Config item 'switches' missing{self.default_message}")
-            self._all_ok = False
+            self._error("Config item 'switches' missing%s", self.default_message)
         elif not isinstance(self.config["switches"], int):
-            logger.error(f"Config item 'switches: {self.config['switches']}' does not seem to be an integer{self.default_message}")
-            self._all_ok = False
+            self._error("Config item 'switches: %s' does not seem to be an integer%s", self.config["switches"], self.default_message)
 
     def validate_machine_config(self):
-        # TODO: Refactor
-        # pylint: disable=too-many-branches
         """
         Validates the machines part of the config
         """
         self._validators_ran += 1
         if "machines" not in self.config:
-            logger.error(f"Config item 'machines' missing{self.default_message}")
-            self._all_ok = False
+            self._error("Config item 'machines' missing%s", self.default_message)
         elif not isinstance(self.config["machines"], dict):
-            logger.error(f"Machines config is not a dict, this means the user config is incorrect{self.default_message}")
-            self._all_ok = False
+            self._error("Machines config is not a dict, this means the user config is incorrect%s", self.default_message)
         else:
             for name, values in self.config["machines"].items():
-                if "type" not in values:
-                    logger.error(f"Type not found for machine {name}{self.default_message}")
-                    self._all_ok = False
-                elif values["type"] not in settings.SUPPORTED_MACHINE_TYPES:
-                    logger.error(
-                        f"Type {values['type']} for machine {name} unsupported. I only support the following types: "
-                        f"{settings.SUPPORTED_MACHINE_TYPES}{self.default_message}"
-                    )
-                    self._all_ok = False
+                if not isinstance(values, dict):
+                    self._error("Config for machine %s is not a dict%s", name, self.default_message)
+                    continue
+                # The handlers run in a fixed order, the VLAN validation relies on the interfaces having been validated
+                for key, handler in (
+                    ("type", self._validate_machine_type),
+                    ("files", self._validate_machine_files),
+                    ("interfaces", self._validate_machine_interfaces),
+                    ("vlans", self._validate_machine_vlans),
+                    ("bridges", self._validate_machine_bridges),
+                ):
+                    handler(name, values.get(key, _MISSING))
 
-                # Files
-                if "files" in values:
-                    if not isinstance(values["files"], dict):
-                        logger.error(f"Files directive for machine {name} is not a dict{self.default_message}")
-                        self._all_ok = False
-                    else:
-                        # Check the files
-                        self.validate_machine_files_parameters(name)
-
-                # Interfaces
-                if "interfaces" not in values:
-                    logger.error(f"Machine {name} does not appear to have any interfaces{self.default_message}")
-                    self._all_ok = False
-                elif not isinstance(values["interfaces"], dict):
-                    logger.error(
-                        f"The interfaces for machine {name} are not given as a dict, "
-                        f"this usually means a typo in the config{self.default_message}"
-                    )
-                    self._all_ok = False
-                else:
-                    self.validate_interface_config(name)
-
-                # VLANs?
-                if "vlans" not in values:
-                    logger.debug(f"Machine {name} does not appear to have any VLAN interfaces, that's okay")
-                elif not isinstance(values["vlans"], dict):
-                    logger.error(
-                        f"Machine {name} has a VLAN config but it does not "
-                        f"appear to be a dict, this usually means a typo in the config{self.default_message}"
-                    )
-                    self._all_ok = False
-                else:
-                    self.validate_vlan_config(name)
-
-                # Bridges?
-                if "bridges" not in values:
-                    logger.debug(f"Machine {name} does not appear to have any Bridge interfaces, that's okay")
-                elif not isinstance(values["bridges"], dict):
-                    logger.error(
-                        f"Machine {name} has a bridge config defined, but it is not a dictionary, "
-                        f"this usally means a typo in the config{self.default_message}"
-                    )
-                    self._all_ok = False
-                else:
-                    self.validate_machine_bridge_config(name)
+    def _validate_machine_type(self, machine: str, machine_type):
+        """
+        Validates the type of a machine, machine_type is _MISSING if the machine has no type
+        """
+        if machine_type is _MISSING:
+            self._error("Type not found for machine %s%s", machine, self.default_message)
+        # A non string type (like a list) is never supported and might not be hashable
+        elif not isinstance(machine_type, str) or machine_type not in self._supported_machine_types:
+            self._error(
+                "Type %s for machine %s unsupported. I only support the following types: %s%s",
+                machine_type,
+                machine,
+                settings.SUPPORTED_MACHINE_TYPES,
+                self.default_message,
+            )
+
+    def _validate_machine_files(self, machine: str, files):
+        """
+        Validates the files directive of a machine, if it has one
+        """
+        if files is _MISSING:
+            return
+        if not isinstance(files, dict):
+            self._error("Files directive for machine %s is not a dict%s", machine, self.default_message)
+        else:
+            self.validate_machine_files_parameters(machine)
+
+    def _validate_machine_interfaces(self, machine: str, interfaces):
+        """
+        Validates the interfaces of a machine, every machine needs at least one
+        """
+        if interfaces is _MISSING:
+            self._error("Machine %s does not appear to have any interfaces%s", machine, self.default_message)
+        elif not isinstance(interfaces, dict):
+            self._error(
+                "The interfaces for machine %s are not given as a dict, this usually means a typo in the config%s",
+                machine,
+                self.default_message,
+            )
+        else:
+            self.validate_interface_config(machine)
+
+    def _validate_machine_vlans(self, machine: str, vlans):
+        """
+        Validates the VLAN interfaces of a machine, if it has any
+        """
+        if vlans is _MISSING:
+            logger.debug("Machine %s does not appear to have any VLAN interfaces, that's okay", machine)
+        elif not isinstance(vlans, dict):
+            self._error(
+                "Machine %s has a VLAN config but it does not appear to be a dict, this usually means a typo in the config%s",
+                machine,
+                self.default_message,
+            )
+        else:
+            self.validate_vlan_config(machine)
 
-    def validate_vlan_config(self, machine):
+    def _validate_machine_bridges(self, machine: str, bridges):
+        """
+        Validates the bridge interfaces of a machine, if it has any
+        """
+        if bridges is _MISSING:
+            logger.debug("Machine %s does not appear to have any Bridge interfaces, that's okay", machine)
+        elif not isinstance(bridges, dict):
+            self._error(
+                "Machine %s has a bridge config defined, but it is not a dictionary, this usally means a typo in the config%s",
+                machine,
+                self.default_message,
+            )
+        else:
+            self.validate_machine_bridge_config(machine)
+
+    def validate_vlan_config(self, machine: str):
+        # pylint: disable=too-many-branches
         """
         Validates the VLAN config of a particular machine
         :param machine: str: the machine to validate the VLAN config for
         """
         vlans = self.config["machines"][machine]["vlans"]
+        interfaces = self.config["machines"][machine].get("interfaces", {})
         for name, values in vlans.items():
-            if "id" not in values:
-                logger.error(f"VLAN {name} on machine {machine} is missing it's vlan id{self.default_message}")
-                self._all_ok = False
+            if not isinstance(values, dict):
+                self._error("VLAN %s on machine %s is not a dict%s", name, machine, self.default_message)
+                continue
+            vlan_id = values.get("id", _MISSING)
+            if vlan_id is _MISSING:
+                self._error("VLAN %s on machine %s is missing it's vlan id%s", name, machine, self.default_message)
             else:
                 try:
-                    self._new_config["machines"][machine]["vlans"][name]["id"] = int(values["id"])
+                    self._cow("machines", machine, "vlans", name)["id"] = int(vlan_id)
                 except ValueError:
-                    logger.error(
-                        f"Unable to cast VLAN {name} with ID {values['id']} from machine {machine} to a integer{self.default_message}"
+                    self._error(
+                        "Unable to cast VLAN %s with ID %s from machine %s to a integer%s",
+                        name,
+                        vlan_id,
+                        machine,
+                        self.default_message,
                     )
-                    self._all_ok = False
-            if "link" not in values:
-                logger.error(f"VLAN {name} on machine {machine} is missing it's link attribute{self.default_message}")
-                self._all_ok = False
-            elif not isinstance(values["link"], str):
-                logger.error(
-                    f"Link {values['link']} for VLAN {name} on machine {machine}, does not seem to be a string{self.default_message}"
-                )
-                self._all_ok = False
+            link = values.get("link", _MISSING)
+            if link is _MISSING:
+                self._error("VLAN %s on machine %s is missing it's link attribute%s", name, machine, self.default_message)
+            elif not isinstance(link, str):
+                self._error("Link %s for VLAN %s on machine %s, does not seem to be a string%s", link, name, machine, self.default_message)
             # This check requires a valid interface config, so we only do it if the previous checks have been successful
-            elif self._all_ok and values["link"] not in self.config["machines"][machine]["interfaces"]:
-                logger.error(
-                    f"Link {values['link']} for VLAN {name} on machine {machine} "
-                    f"does not correspond to any interfaces on the same machine{self.default_message}"
+            elif not self._errors and link not in interfaces:
+                self._error(
+                    "Link %s for VLAN %s on machine %s does not correspond to any interfaces on the same machine%s",
+                    link,
+                    name,
+                    machine,
+                    self.default_message,
                 )
-                self._all_ok = False
-            if "addresses" not in values:
-                logger.debug(f"VLAN {name} on machine {machine} does not have any addresses, that's okay")
-            elif not isinstance(values["addresses"], list):
-                logger.error(f"Addresses on VLAN {name} for machine {machine}, does not seem to be a list{self.default_message}")
-                self._all_ok = False
+            addresses = values.get("addresses", _MISSING)
+            if addresses is _MISSING:
+                logger.debug("VLAN %s on machine %s does not have any addresses, that's okay", name, machine)
+            elif not isinstance(addresses, list):
+                self._error("Addresses on VLAN %s for machine %s, does not seem to be a list%s", name, machine, self.default_message)
             else:
-                for address in values["addresses"]:
+                for address in addresses:
                     try:
-                        ip_interface(address)
+                        _ip_interface(address)
                     except ValueError as e:
-                        logger.error(
-                            f"Address {address} for VLAN {name} on machine {machine} does not seem to be a valid address, "
-                            f"got parse error {e}"
+                        self._error(
+                            "Address %s for VLAN %s on machine %s does not seem to be a valid address, got parse error %s",
+                            address,
+                            name,
+                            machine,
+                            e,
                         )
-                        self._all_ok = False
 
     def validate_machine_files_parameters(self, machine: str):
         """
@@ -202,16 +342,14 @@ class ValidateConfig:
         """
         files = self.config["machines"][machine]["files"]
         for host_file in files.keys():
-            # First check if the user gave a relative dir from the config dir
-            if isdir(join(self.config["config_dir"], host_file)) or isfile(join(self.config["config_dir"], host_file)):
-                logger.debug(f"Updating relative host_file path {host_file} to full path {join(self.config['config_dir'], host_file)}")
-                self._new_config["machines"][machine]["files"][join(self.config["config_dir"], host_file)] = self._new_config["machines"][
-                    machine
-                ]["files"].pop(host_file)
-            # Check for absolute paths
-            elif not isdir(host_file) or not isfile(host_file):
-                logger.error(f"Host file {host_file} for machine {machine} does not seem to be a dir or a file{self.default_message}")
-                self._all_ok = False
+            # Relative paths are relative to the config dir, join() leaves absolute paths as they are
+            full_path = join(self.config["config_dir"], host_file)
+            if not exists(full_path):
+                self._error("Host file %s for machine %s does not seem to be a dir or a file%s", host_file, machine, self.default_message)
+            elif full_path != host_file:
+                logger.debug("Updating relative host_file path %s to full path %s", host_file, full_path)
+                new_files = self._cow("machines", machine, "files")
+                new_files[full_path] = new_files.pop(host_file)
 
     def validate_interface_config(self, machine: str):
         # TODO: Refactor
@@ -222,125 +360,154 @@ class ValidateConfig:
         :param str machine: the machine to validate the interfaces config for
         """
         interfaces = self.config["machines"][machine]["interfaces"]
+        # An invalid switches config is reported by validate_switch_config(), treat every bridge number as invalid in that case
+        switches_max = self.config["switches"] - 1 if isinstance(self.config.get("switches"), int) else -1
         for int_name, int_vals in interfaces.items():
-            if "ipv4" not in int_vals:
-                logger.debug(f"No IPv4 found for interface {int_name} on machine {machine}. That's okay, no IPv4 will be configured")
+            if not isinstance(int_vals, dict):
+                self._error("Interface %s on machine %s is not a dict%s", int_name, machine, self.default_message)
+                continue
+            ipv4 = int_vals.get("ipv4", _MISSING)
+            if ipv4 is _MISSING:
+                logger.debug("No IPv4 found for interface %s on machine %s. That's okay, no IPv4 will be configured", int_name, machine)
             else:
                 # Validate the given IP
                 try:
-                    IPv4Interface(int_vals["ipv4"])
+                    _ipv4_interface(ipv4)
                 except ValueError as e:
-                    logger.error(f"Unable to parse IPv4 address {int_vals['ipv4']} for machine {machine}. Parse error: {e}")
-                    self._all_ok = False
-            if "ipv6" not in int_vals:
-                logger.debug(f"No IPv6 found for interface {int_name} on machine {machine}, that's okay no IPv6 address will be configured")
+                    self._error("Unable to parse IPv4 address %s for machine %s. Parse error: %s", ipv4, machine, e)
+            ipv6 = int_vals.get("ipv6", _MISSING)
+            if ipv6 is _MISSING:
+                logger.debug(
+                    "No IPv6 found for interface %s on machine %s, that's okay no IPv6 address will be configured", int_name, machine
+                )
             else:
                 # Validate the given IP
                 try:
-                    IPv6Interface(int_vals["ipv6"])
+                    _ipv6_interface(ipv6)
                 except ValueError as e:
-                    logger.error(f"Unable to parse IPv6 address {int_vals['ipv6']} for machine {machine}. Parse error: {e}")
-                    self._all_ok = False
-            if "mac" not in int_vals:
-                logger.debug(f"MAC not found for interface {int_name} on machine {machine}, generating a random one")
-                self._new_config["machines"][machine]["interfaces"][int_name]["mac"] = random_mac_generator()
-            # From: https://stackoverflow.com/a/7629690/8632038
-            elif not fullmatch(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", int_vals["mac"]):
-                logger.error(
-                    f"MAC {int_vals['mac']} for interface {int_name} on machine {machine}, does not seem to be valid{self.default_message}"
+                    self._error("Unable to parse IPv6 address %s for machine %s. Parse error: %s", ipv6, machine, e)
+            mac = int_vals.get("mac", _MISSING)
+            if mac is _MISSING:
+                logger.debug("MAC not found for interface %s on machine %s, generating a random one", int_name, machine)
+                self._cow("machines", machine, "interfaces", int_name)["mac"] = random_mac_generator()
+            elif not _MAC_RE.fullmatch(mac):
+                self._error(
+                    "MAC %s for interface %s on machine %s, does not seem to be valid%s",
+                    mac,
+                    int_name,
+                    machine,
+                    self.default_message,
                 )
-                self._all_ok = False
-            if "bridge" not in int_vals:
-                logger.error(f"bridge keyword missing on interface {int_name} for machine {machine}{self.default_message}")
-                self._all_ok = False
-            elif not isinstance(int_vals["bridge"], int) or int_vals["bridge"] > self.config["switches"] - 1:
-                logger.error(
-                    f"Invalid bridge number detected for interface {int_name} on machine {machine}. "
+            bridge = int_vals.get("bridge", _MISSING)
+            if bridge is _MISSING:
+                self._error("bridge keyword missing on interface %s for machine %s%s", int_name, machine, self.default_message)
+            elif not isinstance(bridge, int) or bridge > switches_max:
+                self._error(
+                    "Invalid bridge number detected for interface %s on machine %s. "
                     "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
-                    "(starting at iface number 0)"
+                    "(starting at iface number 0)",
+                    int_name,
+                    machine,
                 )
-                self._all_ok = False
-            if "routes" in int_vals:
-                if not isinstance(int_vals["routes"], list):
-                    logger.error(
-                        f"routes passed to interface {int_name} for machine {machine}, "
-                        f"found type {type(int_vals['routes']).__name__}, expected type 'list'{self.default_message}"
+            routes = int_vals.get("routes", _MISSING)
+            if routes is not _MISSING:
+                if not isinstance(routes, list):
+                    self._error(
+                        "routes passed to interface %s for machine %s, found type %s, expected type 'list'%s",
+                        int_name,
+                        machine,
+                        type(routes).__name__,
+                        self.default_message,
                     )
-                    self._all_ok = False
                 else:
-                    self.validate_interface_routes(int_vals["routes"], int_name, machine)
+                    self.validate_interface_routes(routes, int_name, machine)
 
     def validate_interface_routes(self, routes: list, int_name: str, machine: str):
         for idx, route in enumerate(routes):
-            if "to" not in route:
-                logger.error(
-                    f"'to' keyword missing from route {idx + 1} on interface {int_name} for machine {machine}{self.default_message}"
+            if not isinstance(route, dict):
+                self._error("Route %s on interface %s for machine %s is not a dict%s", idx + 1, int_name, machine, self.default_message)
+                continue
+            to = route.get("to", _MISSING)
+            if to is _MISSING:
+                self._error(
+                    "'to' keyword missing from route %s on interface %s for machine %s%s", idx + 1, int_name, machine, self.default_message
                 )
-                self._all_ok = False
             else:
                 try:
-                    ip_network(route["to"])
+                    _ip_network(to)
                 except ValueError:
-                    if route["to"] == "default":
+                    if to == "default":
                         logger.debug(
-                            f"Updating 'default' to destination for route {idx + 1} on interface {int_name} for machine "
-                            f"{machine} to 0.0.0.0/0 for backwards compatibility"
+                            "Updating 'default' to destination for route %s on interface %s for machine %s "
+                            "to 0.0.0.0/0 for backwards compatibility",
+                            idx + 1,
+                            int_name,
+                            machine,
                         )
-                        self._new_config["machines"][machine]["interfaces"][int_name]["routes"][idx]["to"] = "0.0.0.0/0"
+                        self._cow("machines", machine, "interfaces", int_name, "routes", idx)["to"] = "0.0.0.0/0"
                     else:
-                        logger.error(
-                            f"Invalid 'to' value {route['to']} for route {idx + 1} on interface {int_name} "
-                            f"for machine {machine}{self.default_message}"
+                        self._error(
+                            "Invalid 'to' value %s for route %s on interface %s for machine %s%s",
+                            to,
+                            idx + 1,
+                            int_name,
+                            machine,
+                            self.default_message,
                         )
-                        self._all_ok = False
-            if "via" not in route:
-                logger.error(
-                    f"'via' keyword missing from route {idx + 1} on interface {int_name} for machine {machine}{self.default_message}"
+            via = route.get("via", _MISSING)
+            if via is _MISSING:
+                self._error(
+                    "'via' keyword missing from route %s on interface %s for machine %s%s", idx + 1, int_name, machine, self.default_message
                 )
-                self._all_ok = False
             else:
                 try:
-                    ip_address(route["via"])
+                    _ip_address(via)
                 except ValueError:
-                    logger.error(
-                        f"Invalid 'via' value {route['via']} (not an IP address) for route {idx + 1} on interface {int_name} "
-                        f"for machine {machine}{self.default_message}"
+                    self._error(
+                        "Invalid 'via' value %s (not an IP address) for route %s on interface %s for machine %s%s",
+                        via,
+                        idx + 1,
+                        int_name,
+                        machine,
+                        self.default_message,
                     )
-                    self._all_ok = False
 
     def validate_machine_bridge_config(self, machine: str):
+        # pylint: disable=too-many-branches
         bridges = self.config["machines"][machine]["bridges"]
+        interfaces = self.config["machines"][machine].get("interfaces", {})
         for br_name, br_vals in bridges.items():
-            if "ipv4" not in br_vals:
-                logger.debug(f"Bridge {br_name} on machine {machine} has no IPv4 assigned, that's okay")
+            if not isinstance(br_vals, dict):
+                self._error("Bridge %s on machine %s is not a dict%s", br_name, machine, self.default_message)
+                continue
+            ipv4 = br_vals.get("ipv4", _MISSING)
+            if ipv4 is _MISSING:
+                logger.debug("Bridge %s on machine %s has no IPv4 assigned, that's okay", br_name, machine)
             else:
                 # Validate the given IP
                 try:
-                    IPv4Interface(br_vals["ipv4"])
+                    _ipv4_interface(ipv4)
                 except ValueError as e:
-                    logger.error(f"Unable to parse IPv4 address for bridge {br_name} on machine {machine}, got error: {e}")
-                    self._all_ok = False
-            if "ipv6" not in br_vals:
-                logger.debug(f"Bridge {br_name} on machine {machine} has no IPv6 address, that's okay")
+                    self._error("Unable to parse IPv4 address for bridge %s on machine %s, got error: %s", br_name, machine, e)
+            ipv6 = br_vals.get("ipv6", _MISSING)
+            if ipv6 is _MISSING:
+                logger.debug("Bridge %s on machine %s has no IPv6 address, that's okay", br_name, machine)
             else:
                 try:
                     # Validate the IPv6 address
-                    IPv6Interface(br_vals["ipv6"])
+                    _ipv6_interface(ipv6)
                 except ValueError as e:
-                    logger.error(f"Unable to parse IPv6 address for bridge {br_name} on machine {machine}, got error: {e}")
-                    self._all_ok = False
-            if "slaves" not in br_vals:
-                logger.error(f"Bridge {br_name} on machine {machine} does not have any slaves")
-                self._all_ok = False
-            elif not isinstance(br_vals["slaves"], list):
-                logger.error(f"Slaves on bridge {br_name} for machine {machine}, is not formatted as a list")
-                self._all_ok = False
+                    self._error("Unable to parse IPv6 address for bridge %s on machine %s, got error: %s", br_name, machine, e)
+            slaves = br_vals.get("slaves", _MISSING)
+            if slaves is _MISSING:
+                self._error("Bridge %s on machine %s does not have any slaves", br_name, machine)
+            elif not isinstance(slaves, list):
+                self._error("Slaves on bridge %s for machine %s, is not formatted as a list", br_name, machine)
             else:
                 # For each slave, check if the interface exists
-                for slave in br_vals["slaves"]:
-                    if slave not in self.config["machines"][machine]["interfaces"].keys():
-                        logger.error(f"Undefined slave interface {slave} assigned to bridge {br_name} on machine {machine}")
-                        self._all_ok = False
+                for slave in slaves:
+                    if slave not in interfaces:
+                        self._error("Undefined slave interface %s assigned to bridge %s on machine %s", slave, br_name, machine)
 
     def validate_veth_config(self):
         """
@@ -350,30 +517,26 @@ class ValidateConfig:
             logger.warning("Tried to validate veth config, but no veth config present, skipping...")
             return
         if not isinstance(self.config["veths"], dict):
-            logger.error(f"Config item: 'veths' does not seem to be a dict {self.default_message}")
-            self._all_ok = False
+            self._error("Config item: 'veths' does not seem to be a dict %s", self.default_message)
             return
         for name, values in self.config["veths"].items():
             if not isinstance(name, str):
-                logger.error(f"veth interface name: {name} does not seem to be a string{self.default_message}")
-                self._all_ok = False
+                self._error("veth interface name: %s does not seem to be a string%s", name, self.default_message)
             elif not isinstance(values, dict):
-                logger.error(f"veth interface {name} data does not seem to be a dict{self.default_message}")
-                self._all_ok = False
+                self._error("veth interface %s data does not seem to be a dict%s", name, self.default_message)
             else:
-                if "bridge" not in values:
-                    logger.error(f"veth interface {name} is missing the bridge parameter{self.default_message}")
-                    self._all_ok = False
-                elif not isinstance(values["bridge"], str):
-                    logger.error(f"veth interface {name} bridge parameter does not seem to be a str{self.default_message}")
-                    self._all_ok = False
-                if "peer" not in values:
-                    logger.debug(f"veth interface {name} does not have a peer, that's ok, assuming it's peer is defined elsewhere")
-                elif not isinstance(values["peer"], str):
-                    logger.error(f"veth interface {name} peer parameter does not seem to be a string{self.default_message}")
-                    self._all_ok = False
-                if "stp" not in values:
-                    logger.debug(f"veth interface {name} as no STP parameter, that's okay")
-                elif not isinstance(values["stp"], bool):
-                    logger.error(f"veth interface {name} stp parameter does not seem to be a boolean{self.default_message}")
-                    self._all_ok = False
+                bridge = values.get("bridge", _MISSING)
+                if bridge is _MISSING:
+                    self._error("veth interface %s is missing the bridge parameter%s", name, self.default_message)
+                elif not isinstance(bridge, str):
+                    self._error("veth interface %s bridge parameter does not seem to be a str%s", name, self.default_message)
+                peer = values.get("peer", _MISSING)
+                if peer is _MISSING:
+                    logger.debug("veth interface %s does not have a peer, that's ok, assuming it's peer is defined elsewhere", name)
+                elif not isinstance(peer, str):
+                    self._error("veth interface %s peer parameter does not seem to be a string%s", name, self.default_message)
+                stp = values.get("stp", _MISSING)
+                if stp is _MISSING:
+                    logger.debug("veth interface %s as no STP parameter, that's okay", name)
+                elif not isinstance(stp, bool):
+                    self._error("veth interface %s stp parameter does not seem to be a boolean%s", name, self.default_message)
@@ -1,13 +1,11 @@
-import shlex
-from typing import List
+from errno import ENODEV
+from typing import List, Optional, Dict, Set
 from logging import getLogger
-from subprocess import check_call, CalledProcessError, Popen, DEVNULL
-from os.path import join
+from subprocess import check_output, CalledProcessError, Popen, DEVNULL, STDOUT
+from os.path import join, basename
 from datetime import datetime
 from pyroute2.iproute import IPRoute
-from pyroute2.ndb.main import NDB
-from psutil import process_iter
-from tabulate import tabulate
+from pyroute2.netlink.exceptions import NetlinkError
 
 from vnet_manager.conf import settings
 from vnet_manager.utils.mac import random_mac_generator
@@ -24,19 +22,28 @@ def get_vnet_interface_names_from_config(config: dict) -> List[str]:
     return [settings.VNET_BRIDGE_NAME + str(i) for i in range(0, config["switches"])]
 
 
+def get_machines_by_vnet_interface_names(config: dict) -> Dict[str, List[str]]:
+    """
+    Returns the machines that use the VNet interfaces, for all VNet interfaces at once
+    :param dict config: The config generated by get_config()
+    :return: dict: The lists of VNet machines using an interface, by interface name
+    """
+    machines = {}
+    for m_name, m_data in config["machines"].items():
+        for int_data in m_data["interfaces"].values():
+            machines.setdefault(settings.VNET_BRIDGE_NAME + str(int(int_data["bridge"])), []).append(m_name)
+    return machines
+
+
 def get_machines_by_vnet_interface_name(config: dict, ifname: str) -> List[str]:
     """
     Returns a list of machine that use a particular VNet interface
+    Use get_machines_by_vnet_interface_names() when checking multiple interfaces
     :param dict config: The config generated by get_config()
     :param str ifname: The interface to check for
     :return: list of VNet machines using that interface
     """
-    machines = []
-    for m_name, m_data in config["machines"].items():
-        for int_data in m_data["interfaces"].values():
-            if int(int_data["bridge"]) == int(ifname[-1]):
-                machines.append(m_name)
-    return machines
+    return get_machines_by_vnet_interface_names(config).get(ifname, [])
 
 
 def show_vnet_interface_status(config: dict):
@@ -47,19 +54,23 @@ def show_vnet_interface_status(config: dict):
     logger.info("Listing VNet interface statuses")
     header = ["Name", "Status", "L2_addr", "Sniffer", "STP", "Used by"]
     statuses = []
-    ip = IPRoute()
-    ndb = NDB(log=False)
+    links = get_links_by_name()
+    sniffed = get_sniffed_interface_names()
+    machines = get_machines_by_vnet_interface_names(config)
     for ifname in get_vnet_interface_names_from_config(config):
-        used_by = get_machines_by_vnet_interface_name(config, ifname)
-        dev = ip.link_lookup(ifname=ifname)
-        if not dev:
+        used_by = machines.get(ifname, [])
+        if ifname not in links:
             # Link does not exist
             statuses.append([ifname, "NA", "NA", "NA", "NA", ", ".join(used_by)])
         else:
             # Get the link info
-            sniffer = check_if_sniffer_exists(ifname)
-            with ndb.interfaces[ifname] as info:
-                statuses.append([ifname, info["state"], info["address"], sniffer, bool(info["br_stp_state"]), ", ".join(used_by)])
+            link = links[ifname]
+            attrs = get_link_attrs(link)
+            stp = get_bridge_stp_state(attrs)
+            statuses.append([ifname, link["state"], attrs["IFLA_ADDRESS"], ifname in sniffed, stp, ", ".join(used_by)])
+    # Only the status views need tabulate, so it is not imported when the module is loaded
+    from tabulate import tabulate  # pylint: disable=import-outside-toplevel
+
     print(tabulate(statuses, headers=header, tablefmt="pretty"))
 
 
@@ -72,102 +83,169 @@ def show_vnet_veth_interface_status(config: dict):
     logger.info("Listing VNet veth interface statuses")
     header = ["Name", "Status", "L2_addr", "Peer", "Master"]
     statuses = []
-    ip = IPRoute()
+    links = get_links_by_name()
+    links_by_index = {link["index"]: link for link in links.values()}
     for name, data in config["veths"].items():
-        dev = ip.link_lookup(ifname=name)
-        if not dev:
+        link = links.get(name)
+        if link is None:
             # Link does not exist
             statuses.append([name, "NA", "NA", "NA", data["bridge"]])
         else:
             # Get the link info
-            info = ip.link("get", index=dev[0])
-            state = info[0]["state"]
-            l2_addr = [attr[1] for attr in info[0]["attrs"] if attr[0] == "IFLA_ADDRESS"][0]
-            peer_id = [attr[1] for attr in info[0]["attrs"] if attr[0] == "IFLA_LINK"][0]
-            peer_name = [attr[1] for attr in ip.link("get", index=peer_id)[0]["attrs"] if attr[0] == "IFLA_IFNAME"][0]
-            master_id = [attr[1] for attr in info[0]["attrs"] if attr[0] == "IFLA_MASTER"][0]
-            master_name = [attr[1] for attr in ip.link("get", index=master_id)[0]["attrs"] if attr[0] == "IFLA_IFNAME"][0]
-            statuses.append([name, state, l2_addr, peer_name, master_name])
+            attrs = get_link_attrs(link)
+            peer_name = get_link_attrs(links_by_index[attrs["IFLA_LINK"]])["IFLA_IFNAME"]
+            master_name = get_link_attrs(links_by_index[attrs["IFLA_MASTER"]])["IFLA_IFNAME"]
+            statuses.append([name, link["state"], attrs["IFLA_ADDRESS"], peer_name, master_name])
+    from tabulate import tabulate  # pylint: disable=import-outside-toplevel
+
     print(tabulate(statuses, headers=header, tablefmt="pretty"))
 
 
-def check_if_interface_exists(ifname: str) -> bool:
+def get_link_attrs(link: dict) -> dict:
+    """
+    Get the attributes of a link message as a dict, so the attribute list only has to be scanned once
+    :param dict link: The link message
+    :return: dict: The link attribute values by attribute name, e.g. IFLA_IFNAME
+    """
+    return dict(link["attrs"])
+
+
+def get_bridge_stp_state(attrs: dict) -> bool:
+    """
+    Get the STP state of a bridge from its link attributes (IFLA_LINKINFO -> IFLA_INFO_DATA -> IFLA_BR_STP_STATE)
+    :param dict attrs: The link attributes, as returned by get_link_attrs()
+    :return: bool: True if STP is enabled on the bridge, False otherwise
+    """
+    link_info = attrs.get("IFLA_LINKINFO")
+    info_data = get_link_attrs(link_info).get("IFLA_INFO_DATA") if link_info else None
+    return bool(info_data and get_link_attrs(info_data).get("IFLA_BR_STP_STATE"))
+
+
+def get_links_by_name(ip: Optional[IPRoute] = None) -> Dict[str, dict]:
+    """
+    Get the link messages of all interfaces with a single link dump
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
+    :return: dict: The link messages by interface name
+    """
+    ip = ip or IPRoute()
+    return {get_link_attrs(link)["IFLA_IFNAME"]: link for link in ip.get_links()}
+
+
+def get_link(ifname: str, ip: Optional[IPRoute] = None) -> Optional[dict]:
+    """
+    Get the link message of an interface, the kernel looks up the interface by its name
+    :param str ifname: The interface name to get the link for
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
+    :return: dict: The link message, or None if the interface does not exist
+    :raises NetlinkError: If getting the link fails for any other reason
+    """
+    ip = ip or IPRoute()
+    try:
+        return ip.link("get", ifname=ifname)[0]
+    except NetlinkError as e:
+        if e.code == ENODEV:
+            return None
+        raise
+
+
+def check_if_interface_exists(ifname: str, ip: Optional[IPRoute] = None) -> bool:
     """
     Check if an interface exists
     :param str ifname: The interface name to check for
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     :return: bool: True if the interface exists, False otherwise
     """
-    return bool(IPRoute().link_lookup(ifname=ifname))
+    return get_link(ifname, ip=ip) is not None
 
 
-def create_vnet_interface(ifname: str):
+def create_vnet_interface(ifname: str, ip: Optional[IPRoute] = None):
     """
     Creates a VNet bridge interface
     :param str ifname: The name of the interface to create
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     """
-    logger.info(f"Creating VNet bridge interface {ifname}")
-    IPRoute().link("add", ifname=ifname, kind="bridge")
+    logger.info("Creating VNet bridge interface %s", ifname)
+    ip = ip or IPRoute()
+    ip.link("add", ifname=ifname, kind="bridge")
     # Bring up the interface
-    configure_vnet_interface(ifname)
+    configure_vnet_interface(ifname, ip=ip)
 
 
-def create_veth_interface(name: str, data: dict):
+def create_veth_interface(name: str, data: dict, ip: Optional[IPRoute] = None):
     """
     Creates a veth interface pair
     :param str name: The name of the veth interface to create
     :param dict data: The bridge and peer data
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     """
     # We only create the interface if it has a peer
     if "peer" in data:
-        IPRoute().link("add", ifname=name, kind="veth", peer=data["peer"])
+        ip = ip or IPRoute()
+        ip.link("add", ifname=name, kind="veth", peer=data["peer"])
 
 
-def create_vnet_interface_iptables_rules(ifname: str):
+def get_iptables_filter_rules() -> Set[str]:
     """
-    VNet interfaces should act as dump bridges and should not have any connectivity to the outside world
-    So this function makes some IPtables rules to make sure the VNet interface cannot talk to the outside.
-    :param str ifname: The interface the create IPtables rules for
+    Get the current IPtables filter table rules, as printed by iptables-save
+    :return: set: The rules, e.g. '-A OUTPUT -o vnet-br0 -j DROP'
     """
-    rule = f"OUTPUT -o {ifname} -j DROP"
-    # First we check if the rule already exists
     try:
-        check_call(shlex.split(f"iptables -C {rule}"), stderr=DEVNULL)
-        logger.debug(f"IPtables DROP rule for VNet interface {ifname} already exists, skipping creation")
-    except CalledProcessError:
-        logger.info(f"Creating IPtables DROP rule to the outside world for VNet interface {ifname}")
-        try:
-            check_call(shlex.split(f"iptables -A {rule}"))
-        except CalledProcessError as e:
-            logger.error(f"Unable to create IPtables rule, got output: {e.output}")
+        return set(check_output(["iptables-save", "-t", "filter"], stderr=DEVNULL).decode().splitlines())
+    except CalledProcessError as e:
+        logger.error("Unable to get the current IPtables rules, got output: %s", e.output)
+        return set()
+
+
+def create_vnet_interface_iptables_rules(ifnames: List[str]):
+    """
+    VNet interfaces should act as dump bridges and should not have any connectivity to the outside world
+    So this function makes some IPtables rules to make sure the VNet interfaces cannot talk to the outside.
+    The existing rules are read once and all missing rules are added with a single iptables-restore
+    :param list ifnames: The interfaces the create IPtables rules for
+    """
+    existing = get_iptables_filter_rules()
+    missing = []
+    for ifname in ifnames:
+        rule = f"-A OUTPUT -o {ifname} -j DROP"
+        if rule in existing:
+            logger.debug("IPtables DROP rule for VNet interface %s already exists, skipping creation", ifname)
+        else:
+            logger.info("Creating IPtables DROP rule to the outside world for VNet interface %s", ifname)
+            missing.append(rule)
+    if not missing:
+        return
+    rules = "\n".join(["*filter"] + missing + ["COMMIT", ""])
+    try:
+        check_output(["iptables-restore", "--noflush"], input=rules.encode(), stderr=STDOUT)
+    except CalledProcessError as e:
+        logger.error("Unable to create IPtables rules, got output: %s", e.output)
 
 
-def configure_vnet_interface(ifname: str):
+def configure_vnet_interface(ifname: str, ip: Optional[IPRoute] = None):
     """
     Configures an vnet interface to be in the correct state for forwarding vnet machine traffic
     :param str ifname: The vnet interface to configure
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     """
-    ip = IPRoute()
-    dev = ip.link_lookup(ifname=ifname)[0]
-    # Make sure it's set to down state
-    ip.link("set", index=dev, state="down")
-    # Set the mac
-    ip.link("set", index=dev, address=random_mac_generator())
-    # Finally, bring up the interface
-    ip.link("set", index=dev, state="up")
+    ip = ip or IPRoute()
+    dev = get_link(ifname, ip=ip)["index"]
+    # Set the mac and bring up the interface in one request
+    ip.link("set", index=dev, address=random_mac_generator(), state="up")
 
 
-def configure_veth_interface(name: str, data: dict):
+def configure_veth_interface(name: str, data: dict, ip: Optional[IPRoute] = None):
     """
-    Configures a veth interface, connects to the correct bridge
+    Configures a veth interface, connects to the correct bridge, sets a random mac and brings it up
     :param str name: The name of the veth interface
     :param dict data: The veth interface data (bridge name)
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     """
-    logger.info(f"Creating VNet veth interface {name}")
-    ip = IPRoute()
-    dev = ip.link_lookup(ifname=name)[0]
-    bridge = ip.link_lookup(ifname=data["bridge"])[0]
-    # Connect the veth interface to the bridge
-    ip.link("set", index=dev, master=bridge)
+    logger.info("Creating VNet veth interface %s", name)
+    ip = ip or IPRoute()
+    dev = get_link(name, ip=ip)["index"]
+    bridge = get_link(data["bridge"], ip=ip)["index"]
+    # Set the mac, bring up the interface and connect it to the bridge in one request
+    ip.link("set", index=dev, address=random_mac_generator(), state="up", master=bridge)
 
 
 def bring_up_vnet_interfaces(config: dict, sniffer: bool = False, pcap_dir: str = settings.VNET_SNIFFER_PCAP_DIR):
@@ -177,58 +255,89 @@ def bring_up_vnet_interfaces(config: dict, sniffer: bool = False, pcap_dir: str
     :param bool sniffer: Check for a sniffer process and create it if it does not exist
     :param str pcap_dir: The path to store the sniffer dumps at
     """
+    # All interface operations share a single netlink socket
     ip = IPRoute()
-    for ifname in get_vnet_interface_names_from_config(config):
-        if not check_if_interface_exists(ifname):
-            create_vnet_interface(ifname)
-        # Block traffic to the outside world
-        create_vnet_interface_iptables_rules(ifname)
+    sniffed = get_sniffed_interface_names() if sniffer else set()
+    ifnames = get_vnet_interface_names_from_config(config)
+    # Block traffic to the outside world
+    create_vnet_interface_iptables_rules(ifnames)
+    for ifname in ifnames:
+        if not check_if_interface_exists(ifname, ip=ip):
+            create_vnet_interface(ifname, ip=ip)
         # Make sure the interface is up
         ip.link("set", ifname=ifname, state="up")
-        if sniffer and not check_if_sniffer_exists(ifname):
+        if sniffer and ifname not in sniffed:
             # Create it
             start_tcpdump_on_vnet_interface(ifname=ifname, path=pcap_dir)
     if "veths" in config:
-        ensure_vnet_veth_interfaces(config=config, sniffer=sniffer, pcap_dir=pcap_dir)
+        ensure_vnet_veth_interfaces(config=config, sniffer=sniffer, pcap_dir=pcap_dir, ip=ip)
 
 
-def ensure_vnet_veth_interfaces(config: dict, sniffer: bool = False, pcap_dir: str = settings.VNET_SNIFFER_PCAP_DIR):
+def ensure_vnet_veth_interfaces(
+    config: dict, sniffer: bool = False, pcap_dir: str = settings.VNET_SNIFFER_PCAP_DIR, ip: Optional[IPRoute] = None
+):
     """
     Create en configure the veth interfaces defined in the VNet config
     Assumes there are veth interfaces present in the config
     :param dict config: The config generated by get_config()
     :param bool sniffer: Create sniffer process on veth interfaces if it doesn't exist
     :param str pcap_dir: The path to store the sniffer dumps at
+    :param IPRoute ip: The IPRoute handle to use, a new one is opened if not passed
     """
     logger.info("VNet veth config found, ensuring interfaces")
+    ip = ip or IPRoute()
+    sniffed = get_sniffed_interface_names() if sniffer else set()
     for name, data in config["veths"].items():
         # Set STP on the master if required
         if "stp" in data:
-            logger.info(f"{'Enabling' if data['stp'] else 'Disabling'} STP on VNet interface {data['bridge']}")
+            logger.info("%s STP on VNet interface %s", "Enabling" if data["stp"] else "Disabling", data["bridge"])
             state = 1 if data["stp"] else 0
-            nbd = NDB(log=False)
-            with nbd.interfaces[data["bridge"]] as bridge:
-                bridge.set("br_stp_state", state)
-        if not check_if_interface_exists(name):
-            create_veth_interface(name, data)
+            ip.link("set", ifname=data["bridge"], kind="bridge", br_stp_state=state)
+        if not check_if_interface_exists(name, ip=ip):
+            create_veth_interface(name, data, ip=ip)
         # Always configure a VNet veth interface to make sure it is connected to its master bridge
-        configure_veth_interface(name, data)
-        configure_vnet_interface(name)
-        if sniffer and not check_if_sniffer_exists(name):
+        configure_veth_interface(name, data, ip=ip)
+        if sniffer and name not in sniffed:
             start_tcpdump_on_vnet_interface(ifname=name, path=pcap_dir)
 
 
+def get_sniffed_interface_name(cmdline: Optional[List[str]]) -> Optional[str]:
+    """
+    Get the interface a process is sniffing on from its command line
+    :param list cmdline: The command line of the process
+    :return: str: The interface name if the process is a TCPdump sniffer, None otherwise
+    """
+    if cmdline and any(basename(arg) == "tcpdump" for arg in cmdline) and "-i" in cmdline[:-1]:
+        return cmdline[cmdline.index("-i") + 1]
+    return None
+
+
+def get_sniffed_interface_names() -> Set[str]:
+    """
+    Get the names of all interfaces that have a TCPdump sniffer running, the process table is only scanned once
+    :return: set: The sniffed interface names
+    """
+    # psutil is only needed when sniffers are involved, so it is not imported when the module is loaded
+    from psutil import process_iter  # pylint: disable=import-outside-toplevel
+
+    sniffed = set()
+    for process in process_iter(["cmdline"]):
+        ifname = get_sniffed_interface_name(process.info["cmdline"])
+        if ifname:
+            sniffed.add(ifname)
+    return sniffed
+
+
 def check_if_sniffer_exists(ifname: str) -> bool:
     """
     Check if there is already a sniffer running for a VNet interface
+    Use get_sniffed_interface_names() when checking multiple interfaces
     :param str ifname: The VNet interface name to check
     :return bool: True if it exists, False otherwise
     """
-    for process in process_iter():
-        process_line = process.cmdline()
-        if "tcpdump" in process_line and ifname in process_line:
-            logger.debug(f"A TCPdump sniffer for interface {ifname} already exists")
-            return True
+    if ifname in get_sniffed_interface_names():
+        logger.debug("A TCPdump sniffer for interface %s already exists", ifname)
+        return True
     return False
 
 
@@ -241,24 +350,27 @@ def bring_down_vnet_interfaces(config: dict) -> bool:
     """
     ip = IPRoute()
     lingering_sniffers = False
+    sniffed = get_sniffed_interface_names()
+    # Check which interfaces exist with a single link dump, instead of a lookup per interface
+    links = get_links_by_name(ip=ip)
     if "veths" in config:
         for name in config["veths"].keys():
-            if check_if_interface_exists(name):
-                logger.info(f"Bringing down VNet veth interface {name}")
+            if name in links:
+                logger.info("Bringing down VNet veth interface %s", name)
                 ip.link("set", ifname=name, state="down")
-                if check_if_sniffer_exists(name):
+                if name in sniffed:
                     lingering_sniffers = True
     vnet_interfaces = get_vnet_interface_names_from_config(config)
     for ifname in vnet_interfaces:
         # Set the interface to down status
-        if check_if_interface_exists(ifname):
-            logger.info(f"Bringing down VNet interface {ifname}")
+        if ifname in links:
+            logger.info("Bringing down VNet interface %s", ifname)
             ip.link("set", ifname=ifname, state="down")
         else:
             # Device doesn't exist
-            logger.warning(f"Tried to bring down VNet interface {ifname}, but the interface doesn't exist")
+            logger.warning("Tried to bring down VNet interface %s, but the interface doesn't exist", ifname)
         # check if there is still a sniffer on this interface
-        if check_if_sniffer_exists(ifname):
+        if ifname in sniffed:
             lingering_sniffers = True
     return lingering_sniffers
 
@@ -269,20 +381,24 @@ def delete_vnet_interfaces(config: dict):
     :param config:
     """
     ip = IPRoute()
+    # Check which interfaces exist with a single link dump, instead of a lookup per interface
+    links = get_links_by_name(ip=ip)
     if "veths" in config:
         for name, data in config["veths"].items():
             # Veth interfaces are deleted in pairs, so we only delete the ones with a peer
-            if "peer" in data and check_if_interface_exists(name):
-                logger.info(f"Deleting VNet veth interface {name}")
+            if "peer" in data and name in links:
+                logger.info("Deleting VNet veth interface %s", name)
                 ip.link("del", ifname=name)
+                # Deleting a veth interface also deletes its peer, which might have a peer defined as well
+                links.pop(data["peer"], None)
     for ifname in get_vnet_interface_names_from_config(config):
         # Delete the interface
-        if check_if_interface_exists(ifname):
-            logger.info(f"Deleting VNet interface {ifname}")
+        if ifname in links:
+            logger.info("Deleting VNet interface %s", ifname)
             ip.link("del", ifname=ifname)
         else:
             # Device doesn't exist
-            logger.info(f"Tried to delete VNet interface {ifname}, but it is already gone. That's okay")
+            logger.info("Tried to delete VNet interface %s, but it is already gone. That's okay", ifname)
 
 
 def start_tcpdump_on_vnet_interface(ifname: str, path: str = settings.VNET_SNIFFER_PCAP_DIR):
@@ -291,8 +407,10 @@ def start_tcpdump_on_vnet_interface(ifname: str, path: str = settings.VNET_SNIFF
     :param str ifname: The interface to start the tcpdump on
     """
     path = join(path, f"{ifname}.{datetime.now().strftime('%y%m%d%H%M')}.pcap")
-    logger.info(f"Starting sniffer on VNet interface {ifname}, PCAP location: {path}")
-    Popen(shlex.split(f"tcpdump -i {ifname} -U -w {path}"))  # pylint: disable=consider-using-with
+    logger.info("Starting sniffer on VNet interface %s, PCAP location: %s", ifname, path)
+    # The sniffer keeps running in the background, so it should not read from or write to our terminal
+    # Stderr is kept, so tcpdump errors (e.g. permission denied) are still shown to the user
+    Popen(["tcpdump", "-i", ifname, "-U", "-w", path], stdin=DEVNULL, stdout=DEVNULL)  # pylint: disable=consider-using-with
 
 
 def kill_tcpdump_processes_on_vnet_interfaces(config: dict):
@@ -300,12 +418,12 @@ def kill_tcpdump_processes_on_vnet_interfaces(config: dict):
     Tries to kill all TCPdump processes on associated VNet interfaces
     :param config: The config generated by get_config()
     """
-    interfaces = get_vnet_interface_names_from_config(config)
+    interfaces = set(get_vnet_interface_names_from_config(config))
     if "veths" in config:
-        interfaces.extend(list(config["veths"].keys()))
-    for ifname in interfaces:
-        for process in process_iter():
-            process_line = process.cmdline()
-            if "tcpdump" in process_line and ifname in process_line:
-                logger.info(f"Killing PID {process.pid}")
-                process.kill()
+        interfaces.update(config["veths"].keys())
+    from psutil import process_iter  # pylint: disable=import-outside-toplevel
+
+    for process in process_iter(["cmdline"]):
+        if get_sniffed_interface_name(process.info["cmdline"]) in interfaces:
+            logger.info("Killing PID %s", process.pid)
+            process.kill()
@@ -3,7 +3,6 @@ from logging import getLogger
 from time import sleep
 from subprocess import call
 from typing import List
-from tabulate import tabulate
 from yaml import safe_dump
 from pylxd.exceptions import NotFound, LXDAPIException
 
@@ -27,6 +26,9 @@ def show_status(config: dict):
         provider = settings.MACHINE_TYPE_PROVIDER_MAPPING[info["type"]]
         # Call the relevant provider get_%s_machine_status function
         statuses.append(getattr(modules[__name__], f"get_{provider}_machine_status")(name))
+    # Imported here, so commands that do not show a status table do not pay for the tabulate import
+    from tabulate import tabulate  # pylint: disable=import-outside-toplevel
+
     print(tabulate(statuses, headers=header, tablefmt="pretty"))
 
 
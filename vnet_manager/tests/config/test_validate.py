@@ -1,11 +1,32 @@
 from unittest.mock import Mock, call
 from copy import deepcopy
+from os.path import join
 
 from vnet_manager.tests import VNetTestCase
-from vnet_manager.config.validate import ValidateConfig
+from vnet_manager.config.validate import ValidateConfig, _is_plain_ipv4_interface, _ip_address
 from vnet_manager.conf import settings
 
 
+class TestIsPlainIPv4Interface(VNetTestCase):
+    def test_is_plain_ipv4_interface_accepts_address_with_and_without_prefix(self):
+        self.assertTrue(_is_plain_ipv4_interface("192.168.0.2/24"))
+        self.assertTrue(_is_plain_ipv4_interface("192.168.0.2"))
+
+    def test_is_plain_ipv4_interface_rejects_invalid_octets_and_prefixes(self):
+        for value in ("256.0.0.1/24", "192.168.0/24", "192.168.0.2/33", "192.168.0.2/", "01.2.3.4", "1.2.3.4/024", 42, None):
+            self.assertFalse(_is_plain_ipv4_interface(value), value)
+
+    def test_is_plain_ipv4_interface_leaves_netmask_notation_to_the_ipaddress_parser(self):
+        self.assertFalse(_is_plain_ipv4_interface("192.168.0.2/255.255.255.0"))
+
+
+class TestCachedParser(VNetTestCase):
+    def test_cached_parser_does_not_share_results_between_equal_values_of_a_different_type(self):
+        _ip_address(True)
+        with self.assertRaises(ValueError):
+            _ip_address(1.0)
+
+
 class TestValidateConfigClass(VNetTestCase):
     def setUp(self) -> None:
         self.validator = ValidateConfig(deepcopy(settings.CONFIG))
@@ -25,9 +46,36 @@ class TestValidateConfigClass(VNetTestCase):
     def test_validate_class_returns_proper_string_message(self):
         self.assertEqual(str(self.validator), "VNet config validator, current_state: OK, amount of validators run: 0")
 
+    def test_validate_class_returns_not_ok_string_message_after_an_error(self):
+        self.validator._error("Config item '%s' missing", "switches")
+        self.assertEqual(str(self.validator), "VNet config validator, current_state: NOT OK, amount of validators run: 0")
+
     def test_validate_class_returns_original_config_on_init(self):
         self.assertEqual(self.validator.updated_config, settings.CONFIG)
 
+    def test_validate_class_cow_copies_path_without_touching_the_original_config(self):
+        self.validator._cow("machines", "router100", "interfaces", "eth12")["mac"] = "00:00:00:00:00:01"
+        self.assertEqual(self.validator.updated_config["machines"]["router100"]["interfaces"]["eth12"]["mac"], "00:00:00:00:00:01")
+        self.assertEqual(self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["mac"], "00:00:00:00:01:11")
+
+    def test_validate_class_cow_shares_unchanged_items_with_the_original_config(self):
+        self.validator._cow("machines", "router100", "interfaces", "eth12")["mac"] = "00:00:00:00:00:01"
+        self.assertIs(self.validator.updated_config["machines"]["router101"], self.validator.config["machines"]["router101"])
+
+    def test_validate_function_logs_the_recorded_errors(self):
+        logger = self.set_up_patch("vnet_manager.config.validate.logger")
+        self.switch_config.side_effect = lambda: self.validator._error("Config item '%s' missing", "switches")
+        self.validator.validate()
+        logger.error.assert_called_once_with("Config item '%s' missing", "switches")
+        self.assertEqual(self.validator.errors, ["Config item 'switches' missing"])
+        self.assertFalse(self.validator.config_validation_successful)
+
+    def test_validate_function_resets_errors_from_a_previous_run(self):
+        self.validator._error("Config item '%s' missing", "switches")
+        self.validator.validate()
+        self.assertEqual(self.validator.errors, [])
+        self.assertTrue(self.validator.config_validation_successful)
+
     def test_validate_function_calls_standard_validator_functions(self):
         self.validator.validate()
         self.switch_config.assert_called_once_with()
@@ -57,14 +105,15 @@ class TestValidateConfigValidateSwitchConfig(VNetTestCase):
         del self.validator.config["switches"]
         self.validator.validate_switch_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Config item 'switches' missing{self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"Config item 'switches' missing{self.validator.default_message}"])
 
     def test_validate_switch_config_fails_when_switch_config_not_a_int(self):
         self.validator.config["switches"] = "os3"
         self.validator.validate_switch_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Config item 'switches: {self.validator.config['switches']}' does not seem to be an integer{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"Config item 'switches: {self.validator.config['switches']}' does not seem to be an integer{self.validator.default_message}"],
         )
 
 
@@ -88,37 +137,62 @@ class TestValidateConfigValidateMachineConfig(VNetTestCase):
         del self.validator.config["machines"]
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Config item 'machines' missing{self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"Config item 'machines' missing{self.validator.default_message}"])
 
     def test_validate_machine_config_fails_when_machine_config_not_a_dict(self):
         self.validator.config["machines"] = 42
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Machines config is not a dict, this means the user config is incorrect{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"Machines config is not a dict, this means the user config is incorrect{self.validator.default_message}"],
         )
 
+    def test_validate_machine_config_fails_when_machine_values_not_a_dict(self):
+        self.validator.config["machines"]["router100"] = "banana"
+        self.validator.validate_machine_config()
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(self.validator.errors, [f"Config for machine router100 is not a dict{self.validator.default_message}"])
+
+    def test_validate_machine_config_validates_interfaces_before_vlans_regardless_of_config_order(self):
+        order = []
+        self.validate_interfaces.side_effect = lambda machine: order.append(("interfaces", machine))
+        self.validate_vlan_config.side_effect = lambda machine: order.append(("vlans", machine))
+        machine = self.validator.config["machines"]["router100"]
+        self.validator.config["machines"]["router100"] = {"vlans": machine.pop("vlans"), **machine}
+        self.validator.validate_machine_config()
+        self.assertLess(order.index(("interfaces", "router100")), order.index(("vlans", "router100")))
+
     def test_validate_machine_config_fails_when_machine_type_not_present(self):
         del self.validator.config["machines"]["router100"]["type"]
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Type not found for machine router100{self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"Type not found for machine router100{self.validator.default_message}"])
 
     def test_validate_machine_config_fails_when_machine_type_not_in_supported_machine_types(self):
         self.validator.config["machines"]["router100"]["type"] = "banana"
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Type banana for machine router100 unsupported. I only support the following types: {}{}".format(
-                settings.SUPPORTED_MACHINE_TYPES, self.validator.default_message
-            )
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Type banana for machine router100 unsupported. I only support the following types: {}{}".format(
+                    settings.SUPPORTED_MACHINE_TYPES, self.validator.default_message
+                )
+            ],
         )
 
+    def test_validate_machine_config_fails_when_machine_type_is_not_a_string(self):
+        self.validator.config["machines"]["router100"]["type"] = ["router"]
+        self.validator.validate_machine_config()
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(len(self.validator.errors), 1)
+
     def test_validate_machine_config_fails_when_machine_files_not_a_dict(self):
         self.validator.config["machines"]["router100"]["files"] = "banana"
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Files directive for machine router100 is not a dict{self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"Files directive for machine router100 is not a dict{self.validator.default_message}"])
 
     def test_validate_machine_config_succeeds_when_machine_files_not_present(self):
         del self.validator.config["machines"]["router100"]["files"]
@@ -137,8 +211,8 @@ class TestValidateConfigValidateMachineConfig(VNetTestCase):
         del self.validator.config["machines"]["router100"]["interfaces"]
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Machine router100 does not appear to have any interfaces{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"Machine router100 does not appear to have any interfaces{self.validator.default_message}"]
         )
 
     def test_validate_machine_config_fails_if_interfaces_is_not_a_dict(self):
@@ -147,15 +221,13 @@ class TestValidateConfigValidateMachineConfig(VNetTestCase):
         self.validator.config["machines"]["host102"]["interfaces"] = 42
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        calls = [
-            call(
-                "The interfaces for machine {} are not given as a dict, this usually means a typo in the config{}".format(
-                    machine, self.validator.default_message
-                )
+        errors = [
+            "The interfaces for machine {} are not given as a dict, this usually means a typo in the config{}".format(
+                machine, self.validator.default_message
             )
             for machine in self.validator.config["machines"].keys()
         ]
-        self.logger.error.assert_has_calls(calls)
+        self.assertEqual(self.validator.errors, errors)
         self.assertFalse(self.validate_interfaces.called)
 
     def test_validate_machine_config_calls_validate_interface_config(self):
@@ -177,9 +249,12 @@ class TestValidateConfigValidateMachineConfig(VNetTestCase):
         self.validator.config["machines"]["router100"]["vlans"] = 1337
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Machine router100 has a VLAN config but it does not appear to be a dict, "
-            "this usually means a typo in the config{}".format(self.validator.default_message)
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Machine router100 has a VLAN config but it does not appear to be a dict, "
+                "this usually means a typo in the config{}".format(self.validator.default_message)
+            ],
         )
 
     def test_validate_machine_config_does_not_call_validate_bridge_config_if_no_bridges(self):
@@ -195,33 +270,57 @@ class TestValidateConfigValidateMachineConfig(VNetTestCase):
         self.validator.config["machines"]["router100"]["bridges"] = 1337
         self.validator.validate_machine_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once()
+        self.assertEqual(len(self.validator.errors), 1)
 
 
 class TestValidateConfigValidateMachineFilesParameters(VNetTestCase):
     def setUp(self) -> None:
         # Use VALIDATED_CONFIG so we have the config_dir
         self.validator = ValidateConfig(deepcopy(settings.VALIDATED_CONFIG))
-        self.is_dir = self.set_up_patch("vnet_manager.config.validate.isdir")
-        self.is_dir.return_value = False
-        self.is_file = self.set_up_patch("vnet_manager.config.validate.isfile")
-        self.is_file.return_value = False
+        self.exists = self.set_up_patch("vnet_manager.config.validate.exists")
+        self.exists.return_value = False
         self.logger = self.set_up_patch("vnet_manager.config.validate.logger")
 
     def test_validate_machine_file_parameters_fails_when_no_file_or_dir_found(self):
         self.validator.validate_machine_files_parameters("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.assertTrue(self.logger.error.called)
+        self.assertTrue(self.validator.errors)
 
-    def test_validate_machine_file_parameters_is_ok_when_is_dir_is_true(self):
-        self.is_dir.return_value = True
+    def test_validate_machine_file_parameters_is_ok_when_relative_path_exists(self):
+        self.exists.return_value = True
         self.validator.validate_machine_files_parameters("router100")
         self.assertTrue(self.validator.config_validation_successful)
 
-    def test_validate_machine_file_parameters_is_ok_when_is_file_is_true(self):
-        self.is_file.return_value = True
+    def test_validate_machine_file_parameters_checks_relative_path_with_a_single_exists_call(self):
+        self.validator.config["machines"]["router100"]["files"] = {"router100": "/etc/frr/"}
+        self.exists.return_value = True
+        self.validator.validate_machine_files_parameters("router100")
+        self.exists.assert_called_once_with(join(self.validator.config["config_dir"], "router100"))
+
+    def test_validate_machine_file_parameters_is_ok_when_absolute_path_exists(self):
+        self.validator.config["machines"]["router100"]["files"] = {"/etc/vnet/router100": "/etc/frr/"}
+        self.exists.return_value = True
         self.validator.validate_machine_files_parameters("router100")
         self.assertTrue(self.validator.config_validation_successful)
+        self.exists.assert_called_once_with("/etc/vnet/router100")
+        self.assertIs(self.validator.updated_config, self.validator.config)
+
+    def test_validate_machine_file_parameters_fails_when_absolute_path_does_not_exist(self):
+        self.validator.config["machines"]["router100"]["files"] = {"/etc/vnet/router100": "/etc/frr/"}
+        self.validator.validate_machine_files_parameters("router100")
+        self.assertEqual(
+            self.validator.errors,
+            [f"Host file /etc/vnet/router100 for machine router100 does not seem to be a dir or a file{self.validator.default_message}"],
+        )
+
+    def test_validate_machine_file_parameters_updates_relative_path_to_full_path(self):
+        self.validator.config["machines"]["router100"]["files"] = {"router100": "/etc/frr/"}
+        self.exists.return_value = True
+        self.validator.validate_machine_files_parameters("router100")
+        self.assertEqual(
+            self.validator.updated_config["machines"]["router100"]["files"],
+            {join(self.validator.config["config_dir"], "router100"): "/etc/frr/"},
+        )
 
 
 class TestValidateConfigValidateInterfaceConfig(VNetTestCase):
@@ -243,7 +342,18 @@ class TestValidateConfigValidateInterfaceConfig(VNetTestCase):
         self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["ipv4"] = "255.255.256.257"
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once()
+        self.assertEqual(len(self.validator.errors), 1)
+
+    def test_validate_interface_config_accepts_ipv4_in_netmask_notation(self):
+        self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["ipv4"] = "192.168.0.2/255.255.255.0"
+        self.validator.validate_interface_config("router100")
+        self.assertTrue(self.validator.config_validation_successful)
+
+    def test_validate_interface_config_fails_when_ipv4_is_unhashable(self):
+        self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["ipv4"] = ["192.168.0.2/24"]
+        self.validator.validate_interface_config("router100")
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(len(self.validator.errors), 1)
 
     def test_validate_interface_config_does_not_fail_when_ipv6_not_present(self):
         del self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["ipv6"]
@@ -254,42 +364,84 @@ class TestValidateConfigValidateInterfaceConfig(VNetTestCase):
         self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["ipv6"] = "2001:h80:1:2d96::f1a5/64"
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once()
+        self.assertEqual(len(self.validator.errors), 1)
+
+    def test_validate_interface_config_accepts_dash_separated_mac(self):
+        self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["mac"] = "00-00-00-00-01-11"
+        self.validator.validate_interface_config("router100")
+        self.assertTrue(self.validator.config_validation_successful)
+
+    def test_validate_interface_config_fails_when_mac_not_valid(self):
+        self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["mac"] = "00:00:00:00:01:1g"
+        self.validator.validate_interface_config("router100")
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(
+            self.validator.errors,
+            [f"MAC 00:00:00:00:01:1g for interface eth12 on machine router100, does not seem to be valid{self.validator.default_message}"],
+        )
+
+    def test_validate_interface_config_fails_when_interface_values_not_a_dict(self):
+        self.validator.config["machines"]["router100"]["interfaces"]["eth12"] = "bridge"
+        self.validator.validate_interface_config("router100")
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(self.validator.errors, [f"Interface eth12 on machine router100 is not a dict{self.validator.default_message}"])
 
     def test_validate_interface_config_fails_when_bridge_not_present(self):
         del self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["bridge"]
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"bridge keyword missing on interface eth12 for machine router100{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"bridge keyword missing on interface eth12 for machine router100{self.validator.default_message}"]
         )
 
     def test_validate_interface_config_fails_when_bridge_not_a_int(self):
         self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["bridge"] = "42"
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Invalid bridge number detected for interface eth12 on machine router100. "
-            "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
-            "(starting at iface number 0)"
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Invalid bridge number detected for interface eth12 on machine router100. "
+                "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
+                "(starting at iface number 0)"
+            ],
         )
 
     def test_validate_interface_config_fails_when_bridge_number_higher_then_the_amount_of_switches(self):
         self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["bridge"] = 3
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Invalid bridge number detected for interface eth12 on machine router100. "
-            "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
-            "(starting at iface number 0)"
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Invalid bridge number detected for interface eth12 on machine router100. "
+                "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
+                "(starting at iface number 0)"
+            ],
+        )
+
+    def test_validate_interface_config_fails_when_switches_is_not_a_int(self):
+        self.validator.config["switches"] = "os3"
+        self.validator.validate_interface_config("router100")
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Invalid bridge number detected for interface eth12 on machine router100. "
+                "The bridge keyword should correspond to the interface number of the vnet bridge to connect to "
+                "(starting at iface number 0)"
+            ],
         )
 
     def test_validate_interface_config_fails_when_routes_is_not_a_list(self):
         self.validator.config["machines"]["router100"]["interfaces"]["eth12"]["routes"] = "blaap"
         self.validator.validate_interface_config("router100")
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"routes passed to interface eth12 for machine router100, found type str, expected type 'list'{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [
+                f"routes passed to interface eth12 for machine router100, found type str, expected type 'list'{self.validator.default_message}"
+            ],
         )
 
     def test_validate_interface_config_calls_validate_routes_when_routes_passed_in_config(self):
@@ -314,46 +466,66 @@ class TestValidateInterfaceRoutes(VNetTestCase):
     def test_validate_routes_validates_correct_routes(self):
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertTrue(self.validator.config_validation_successful)
-        self.assertFalse(self.logger.error.called)
+        self.assertFalse(self.validator.errors)
+
+    def test_validate_routes_fails_if_route_is_not_a_dict(self):
+        self.routes[0] = "default"
+        self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(
+            self.validator.errors, [f"Route 1 on interface eth12 for machine {self.machine} is not a dict{self.validator.default_message}"]
+        )
 
     def test_validate_routes_fails_if_route_missing_to(self):
         del self.routes[0]["to"]
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"'to' keyword missing from route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"'to' keyword missing from route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"],
         )
 
     def test_validate_routes_fails_if_to_is_malformed(self):
         self.routes[0]["to"] = "1negen2.168.0.1"
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Invalid 'to' value 1negen2.168.0.1 for route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [
+                f"Invalid 'to' value 1negen2.168.0.1 for route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"
+            ],
         )
 
     def test_validate_routes_fails_if_route_missing_via(self):
         del self.routes[0]["via"]
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"'via' keyword missing from route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"'via' keyword missing from route 1 on interface eth12 for machine {self.machine}{self.validator.default_message}"],
         )
 
     def test_validate_routes_fails_if_via_is_malformed(self):
         self.routes[1]["via"] = "blaap"
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Invalid 'via' value blaap (not an IP address) for route 2 on interface eth12 for machine {}{}".format(
-                self.machine, self.validator.default_message
-            )
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Invalid 'via' value blaap (not an IP address) for route 2 on interface eth12 for machine {}{}".format(
+                    self.machine, self.validator.default_message
+                )
+            ],
         )
 
     def test_validate_routes_updates_default_route_to_quad_zero(self):
         self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
         self.assertEqual(self.validator.updated_config["machines"][self.machine]["interfaces"]["eth12"]["routes"][1]["to"], "0.0.0.0/0")
 
+    def test_validate_routes_does_not_update_the_passed_config(self):
+        self.validator.validate_interface_routes(self.routes, "eth12", self.machine)
+        self.assertEqual(self.validator.config["machines"][self.machine]["interfaces"]["eth12"]["routes"][1]["to"], "default")
+
 
 class TestValidateConfigValidateVethConfig(VNetTestCase):
     def setUp(self) -> None:
@@ -370,52 +542,54 @@ class TestValidateConfigValidateVethConfig(VNetTestCase):
         self.validator.config["veths"] = 42
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Config item: 'veths' does not seem to be a dict {self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"Config item: 'veths' does not seem to be a dict {self.validator.default_message}"])
 
     def test_validate_veth_config_fails_when_veth_config_name_if_not_a_string(self):
         self.validator.config["veths"][42] = self.validator.config["veths"].pop("vnet-veth1")
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"veth interface name: 42 does not seem to be a string{self.validator.default_message}")
+        self.assertEqual(self.validator.errors, [f"veth interface name: 42 does not seem to be a string{self.validator.default_message}"])
 
     def test_validate_veth_config_fails_when_veth_config_values_if_not_a_dict(self):
         self.validator.config["veths"]["vnet-veth1"] = "blaap"
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"veth interface vnet-veth1 data does not seem to be a dict{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"veth interface vnet-veth1 data does not seem to be a dict{self.validator.default_message}"]
         )
 
     def test_validate_veth_config_fails_when_veth_config_parameter_bridge_missing(self):
         del self.validator.config["veths"]["vnet-veth1"]["bridge"]
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"veth interface vnet-veth1 is missing the bridge parameter{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"veth interface vnet-veth1 is missing the bridge parameter{self.validator.default_message}"]
         )
 
     def test_validate_veth_config_fails_when_veth_config_parameter_bridge_is_not_a_string(self):
         self.validator.config["veths"]["vnet-veth1"]["bridge"] = 42
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"veth interface vnet-veth1 bridge parameter does not seem to be a str{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"veth interface vnet-veth1 bridge parameter does not seem to be a str{self.validator.default_message}"]
         )
 
     def test_validate_veth_config_fails_when_veth_config_parameter_peer_is_not_a_string(self):
         self.validator.config["veths"]["vnet-veth1"]["peer"] = 42
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"veth interface vnet-veth1 peer parameter does not seem to be a string{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"veth interface vnet-veth1 peer parameter does not seem to be a string{self.validator.default_message}"],
         )
 
     def test_validate_veth_config_fails_when_veth_config_parameter_stp_is_not_a_bool(self):
         self.validator.config["veths"]["vnet-veth1"]["stp"] = "42"
         self.validator.validate_veth_config()
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"veth interface vnet-veth1 stp parameter does not seem to be a boolean{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"veth interface vnet-veth1 stp parameter does not seem to be a boolean{self.validator.default_message}"],
         )
 
 
@@ -429,52 +603,64 @@ class TestValidateConfigValidateVLANConfig(VNetTestCase):
         self.validator.validate_vlan_config(self.machine)
         self.assertTrue(self.validator.config_validation_successful)
 
+    def test_validate_vlan_config_fails_if_vlan_values_not_a_dict(self):
+        self.validator.config["machines"][self.machine]["vlans"]["vlan.100"] = 100
+        self.validator.validate_vlan_config(self.machine)
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(self.validator.errors, [f"VLAN vlan.100 on machine {self.machine} is not a dict{self.validator.default_message}"])
+
     def test_validate_vlan_config_fails_is_id_is_not_present(self):
         del self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["id"]
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"VLAN vlan.100 on machine {self.machine} is missing it's vlan id{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors, [f"VLAN vlan.100 on machine {self.machine} is missing it's vlan id{self.validator.default_message}"]
         )
 
     def test_validate_vlan_config_fails_if_id_is_not_castable_to_int(self):
         self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["id"] = "banaan"
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Unable to cast VLAN vlan.100 with ID banaan from machine {self.machine} to a integer{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"Unable to cast VLAN vlan.100 with ID banaan from machine {self.machine} to a integer{self.validator.default_message}"],
         )
 
     def test_validate_vlan_config_fails_if_link_is_not_present(self):
         del self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["link"]
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"VLAN vlan.100 on machine {self.machine} is missing it's link attribute{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"VLAN vlan.100 on machine {self.machine} is missing it's link attribute{self.validator.default_message}"],
         )
 
     def test_validate_vlan_config_fails_if_link_is_not_a_string(self):
         self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["link"] = 42
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            f"Link 42 for VLAN vlan.100 on machine {self.machine}, does not seem to be a string{self.validator.default_message}"
+        self.assertEqual(
+            self.validator.errors,
+            [f"Link 42 for VLAN vlan.100 on machine {self.machine}, does not seem to be a string{self.validator.default_message}"],
         )
 
     def test_validate_vlan_config_fails_if_link_is_not_found_in_machine_interfaces(self):
         self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["link"] = "eth1337"
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(
-            "Link eth1337 for VLAN vlan.100 on machine {} does not correspond to any interfaces on "
-            "the same machine{}".format(self.machine, self.validator.default_message)
+        self.assertEqual(
+            self.validator.errors,
+            [
+                "Link eth1337 for VLAN vlan.100 on machine {} does not correspond to any interfaces on "
+                "the same machine{}".format(self.machine, self.validator.default_message)
+            ],
         )
 
     def test_validate_vlan_config_does_not_check_link_in_interfaces_if_config_validation_already_failed(self):
-        self.validator._all_ok = False
+        self.validator._error("Earlier error")
         self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["link"] = "eth1337"
         self.validator.validate_vlan_config(self.machine)
-        self.assertFalse(self.logger.error.called)
+        self.assertEqual(self.validator.errors, ["Earlier error"])
 
     def test_validate_vlan_config_does_not_fail_if_addresses_not_in_values(self):
         del self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["addresses"]
@@ -485,7 +671,7 @@ class TestValidateConfigValidateVLANConfig(VNetTestCase):
         self.validator.config["machines"][self.machine]["vlans"]["vlan.100"]["addresses"].append("banaan")
         self.validator.validate_vlan_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.assertTrue(self.logger.error.call_args_list[0].startswith(f"Address banaan for VLAN vlan.100 on machine {self.machine}"))
+        self.assertTrue(self.validator.errors[0].startswith(f"Address banaan for VLAN vlan.100 on machine {self.machine}"))
 
 
 class TestValidateConfigValidateMachineBridgeConfig(VNetTestCase):
@@ -512,29 +698,35 @@ class TestValidateConfigValidateMachineBridgeConfig(VNetTestCase):
         self.validator.config["machines"][self.machine]["bridges"]["br1"]["ipv4"] = "blaap"
         self.validator.validate_machine_bridge_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once()
+        self.assertEqual(len(self.validator.errors), 1)
 
     def test_validate_machine_bridge_config_fails_if_incorrect_ipv6(self):
         self.validator.config["machines"][self.machine]["bridges"]["br1"]["ipv6"] = "blaap"
         self.validator.validate_machine_bridge_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once()
+        self.assertEqual(len(self.validator.errors), 1)
+
+    def test_validate_machine_bridge_config_fails_if_bridge_values_not_a_dict(self):
+        self.validator.config["machines"][self.machine]["bridges"]["br1"] = ["eth12"]
+        self.validator.validate_machine_bridge_config(self.machine)
+        self.assertFalse(self.validator.config_validation_successful)
+        self.assertEqual(self.validator.errors, [f"Bridge br1 on machine {self.machine} is not a dict{self.validator.default_message}"])
 
     def test_validate_machine_bridge_config_fails_if_slaves_not_in_bridge_params(self):
         del self.validator.config["machines"][self.machine]["bridges"]["br1"]["slaves"]
         self.validator.validate_machine_bridge_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Bridge br1 on machine {self.machine} does not have any slaves")
+        self.assertEqual(self.validator.errors, [f"Bridge br1 on machine {self.machine} does not have any slaves"])
 
     def test_validate_machine_bridge_config_fails_if_slaves_param_is_not_a_list(self):
         self.validator.config["machines"][self.machine]["bridges"]["br1"]["slaves"] = "blaap"
         self.validator.validate_machine_bridge_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Slaves on bridge br1 for machine {self.machine}, is not formatted as a list")
+        self.assertEqual(self.validator.errors, [f"Slaves on bridge br1 for machine {self.machine}, is not formatted as a list"])
 
     def test_validate_machine_bridge_config_fails_if_slave_not_present_in_interfaces_config(self):
         iface = "blaap1"
         self.validator.config["machines"][self.machine]["bridges"]["br1"]["slaves"].append(iface)
         self.validator.validate_machine_bridge_config(self.machine)
         self.assertFalse(self.validator.config_validation_successful)
-        self.logger.error.assert_called_once_with(f"Undefined slave interface {iface} assigned to bridge br1 on machine {self.machine}")
+        self.assertEqual(self.validator.errors, [f"Undefined slave interface {iface} assigned to bridge br1 on machine {self.machine}"])
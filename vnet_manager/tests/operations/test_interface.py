@@ -1,22 +1,32 @@
-import shlex
-from subprocess import DEVNULL, CalledProcessError
+from errno import ENODEV, EPERM
+from subprocess import DEVNULL, STDOUT, CalledProcessError
 from unittest.mock import Mock, MagicMock, ANY, call
 from copy import deepcopy
 
+from pyroute2.netlink.exceptions import NetlinkError
+
 from vnet_manager.tests import VNetTestCase
 from vnet_manager.operations.interface import (
     get_vnet_interface_names_from_config,
+    get_machines_by_vnet_interface_names,
     get_machines_by_vnet_interface_name,
     show_vnet_interface_status,
     show_vnet_veth_interface_status,
+    get_link_attrs,
+    get_bridge_stp_state,
+    get_links_by_name,
+    get_link,
     check_if_interface_exists,
     create_vnet_interface,
     create_veth_interface,
+    get_iptables_filter_rules,
     create_vnet_interface_iptables_rules,
     configure_vnet_interface,
     configure_veth_interface,
     bring_up_vnet_interfaces,
     ensure_vnet_veth_interfaces,
+    get_sniffed_interface_name,
+    get_sniffed_interface_names,
     check_if_sniffer_exists,
     bring_down_vnet_interfaces,
     delete_vnet_interfaces,
@@ -50,18 +60,43 @@ class TestGetMachinesByVNetInterfaceName(VNetTestCase):
         for interface in interface_mapping:
             self.assertEqual(get_machines_by_vnet_interface_name(settings.CONFIG, interface), interface_mapping[interface])
 
+    def test_get_machines_by_vnet_interface_name_returns_an_empty_list_for_an_unused_interface(self):
+        self.assertEqual(get_machines_by_vnet_interface_name(settings.CONFIG, settings.VNET_BRIDGE_NAME + "2"), [])
+
+    def test_get_machines_by_vnet_interface_name_does_not_match_on_the_last_digit_only(self):
+        config = deepcopy(settings.CONFIG)
+        config["machines"]["host102"]["interfaces"]["eth23"]["bridge"] = 11
+        self.assertEqual(get_machines_by_vnet_interface_name(config, settings.VNET_BRIDGE_NAME + "1"), ["router101"])
+        self.assertEqual(get_machines_by_vnet_interface_name(config, settings.VNET_BRIDGE_NAME + "11"), ["host102"])
+
+
+class TestGetMachinesByVNetInterfaceNames(VNetTestCase):
+    def test_get_machines_by_vnet_interface_names_returns_the_machines_for_all_interfaces(self):
+        self.assertEqual(
+            get_machines_by_vnet_interface_names(settings.CONFIG),
+            {settings.VNET_BRIDGE_NAME + "0": ["router100", "router101"], settings.VNET_BRIDGE_NAME + "1": ["router101", "host102"]},
+        )
+
 
 class TestShowVNetInterfaceStatus(VNetTestCase):
     def setUp(self) -> None:
         self.iproute_obj = Mock()
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute.return_value = self.iproute_obj
-        self.iproute_obj.link_lookup.return_value = "dev1"
-        self.ndb_obj = MagicMock()
-        self.ndb = self.set_up_patch("vnet_manager.operations.interface.NDB", themock=MagicMock())
-        self.check_if_sniffer_exists = self.set_up_patch("vnet_manager.operations.interface.check_if_sniffer_exists")
-        self.check_if_sniffer_exists.return_value = True
-        self.tabulate = self.set_up_patch("vnet_manager.operations.interface.tabulate")
+        self.iproute_obj.get_links.return_value = [
+            {
+                "index": 1,
+                "state": "up",
+                "attrs": [
+                    ("IFLA_IFNAME", "vnet-br0"),
+                    ("IFLA_ADDRESS", "mac"),
+                    ("IFLA_LINKINFO", {"attrs": [("IFLA_INFO_KIND", "bridge"), ("IFLA_INFO_DATA", {"attrs": [("IFLA_BR_STP_STATE", 1)]})]}),
+                ],
+            }
+        ]
+        self.sniffed = self.set_up_patch("vnet_manager.operations.interface.get_sniffed_interface_names")
+        self.sniffed.return_value = {"vnet-br0"}
+        self.tabulate = self.set_up_patch("tabulate.tabulate")
         self.interfaces = self.set_up_patch("vnet_manager.operations.interface.get_vnet_interface_names_from_config")
         self.interfaces.return_value = ["vnet-br0"]
 
@@ -69,51 +104,56 @@ class TestShowVNetInterfaceStatus(VNetTestCase):
         show_vnet_interface_status(settings.CONFIG)
         self.iproute.assert_called_once_with()
 
-    def test_show_vnet_interface_status_calls_ndb(self):
+    def test_show_vnet_interface_status_shows_the_link_state_address_and_stp_state(self):
         show_vnet_interface_status(settings.CONFIG)
-        self.ndb.assert_called_once_with(log=False)
+        self.tabulate.assert_called_once_with(
+            [["vnet-br0", "up", "mac", True, True, "router100, router101"]],
+            headers=["Name", "Status", "L2_addr", "Sniffer", "STP", "Used by"],
+            tablefmt="pretty",
+        )
 
     def test_show_vnet_interfaces_status_calls_get_vnet_interface_names_from_config(self):
         show_vnet_interface_status(settings.CONFIG)
         self.interfaces.assert_called_once_with(settings.CONFIG)
 
-    def test_show_vnet_interface_status_calls_get_machines_by_vnet_interface_name(self):
-        machines = self.set_up_patch("vnet_manager.operations.interface.get_machines_by_vnet_interface_name")
-        machines.return_value = []
+    def test_show_vnet_interface_status_calls_get_machines_by_vnet_interface_names(self):
+        machines = self.set_up_patch("vnet_manager.operations.interface.get_machines_by_vnet_interface_names")
+        machines.return_value = {}
         show_vnet_interface_status(settings.CONFIG)
-        machines.assert_called_once_with(settings.CONFIG, self.interfaces.return_value[0])
+        machines.assert_called_once_with(settings.CONFIG)
 
-    def test_show_vnet_interface_status_calls_link_lookup(self):
+    def test_show_vnet_interface_status_dumps_the_links_once(self):
+        self.interfaces.return_value = ["vnet-br0", "vnet-br1"]
         show_vnet_interface_status(settings.CONFIG)
-        self.iproute_obj.link_lookup.assert_called_once_with(ifname=self.interfaces.return_value[0])
+        self.iproute_obj.get_links.assert_called_once_with()
 
-    def test_show_vnet_interface_status_calls_check_if_sniffer_exists(self):
+    def test_show_vnet_interface_status_scans_for_sniffers_once(self):
+        self.interfaces.return_value = ["vnet-br0", "vnet-br1"]
         show_vnet_interface_status(settings.CONFIG)
-        self.check_if_sniffer_exists.assert_called_once_with(self.interfaces.return_value[0])
+        self.sniffed.assert_called_once_with()
 
     def test_show_vnet_interface_status_calls_tabulate(self):
         show_vnet_interface_status(settings.CONFIG)
         self.tabulate.assert_called_once_with(
-            [["vnet-br0", ANY, ANY, self.check_if_sniffer_exists.return_value, True, "router100, router101"]],
+            [["vnet-br0", ANY, ANY, True, True, "router100, router101"]],
             headers=["Name", "Status", "L2_addr", "Sniffer", "STP", "Used by"],
             tablefmt="pretty",
         )
 
     def test_show_vnet_interface_status_makes_correct_output_if_interface_does_not_exist(self):
-        self.iproute_obj.link_lookup.return_value = []
+        self.iproute_obj.get_links.return_value = []
         show_vnet_interface_status(settings.CONFIG)
-        self.assertFalse(self.check_if_sniffer_exists.called)
         self.tabulate.assert_called_once_with(
             [["vnet-br0", "NA", "NA", "NA", "NA", "router100, router101"]],
             headers=["Name", "Status", "L2_addr", "Sniffer", "STP", "Used by"],
             tablefmt="pretty",
         )
 
-    def test_show_vnet_interface_status_displays_result_if_check_if_sniffer_exists(self):
-        self.check_if_sniffer_exists.return_value = False
+    def test_show_vnet_interface_status_displays_result_if_no_sniffer_exists(self):
+        self.sniffed.return_value = set()
         show_vnet_interface_status(settings.CONFIG)
         self.tabulate.assert_called_once_with(
-            [["vnet-br0", ANY, ANY, self.check_if_sniffer_exists.return_value, True, "router100, router101"]],
+            [["vnet-br0", ANY, ANY, False, True, "router100, router101"]],
             headers=["Name", "Status", "L2_addr", "Sniffer", "STP", "Used by"],
             tablefmt="pretty",
         )
@@ -124,45 +164,41 @@ class TestShowVNetVethInterfaceStatus(VNetTestCase):
         self.iproute_obj = Mock()
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute.return_value = self.iproute_obj
-        self.iproute_obj.link.return_value = [
+        self.iproute_obj.get_links.return_value = [
             {
+                "index": 10,
                 "state": "up",
-                "attrs": [
-                    ("IFLA_ADDRESS", "mac"),
-                    ("IFLA_LINK", "dev2"),
-                    ("IFLA_IFNAME", "peer"),
-                    ("IFLA_MASTER", "eth0"),
-                    ("IFLA_IFNAME", "master"),
-                ],
-            }
+                "attrs": [("IFLA_IFNAME", "vnet-veth0"), ("IFLA_ADDRESS", "mac0"), ("IFLA_LINK", 11), ("IFLA_MASTER", 20)],
+            },
+            {
+                "index": 11,
+                "state": "down",
+                "attrs": [("IFLA_IFNAME", "vnet-veth1"), ("IFLA_ADDRESS", "mac1"), ("IFLA_LINK", 10), ("IFLA_MASTER", 21)],
+            },
+            {"index": 20, "state": "up", "attrs": [("IFLA_IFNAME", "vnet-br0"), ("IFLA_ADDRESS", "mac20")]},
+            {"index": 21, "state": "up", "attrs": [("IFLA_IFNAME", "vnet-br1"), ("IFLA_ADDRESS", "mac21")]},
         ]
-        self.iproute_obj.link_lookup.return_value = ["dev1"]
-        self.tabulate = self.set_up_patch("vnet_manager.operations.interface.tabulate")
+        self.tabulate = self.set_up_patch("tabulate.tabulate")
 
     def test_show_vnet_veth_interface_status_calls_iproute(self):
         show_vnet_veth_interface_status(settings.CONFIG)
         self.iproute.assert_called_once_with()
 
-    def test_show_vnet_veth_interface_status_calls_ip_lookup(self):
-        calls = [call(ifname=i) for i in settings.CONFIG["veths"]]
+    def test_show_vnet_veth_interface_status_dumps_the_links_once(self):
         show_vnet_veth_interface_status(settings.CONFIG)
-        self.iproute_obj.link_lookup.assert_has_calls(calls)
-
-    def test_show_vnet_veth_interface_status_calls_ip_link(self):
-        show_vnet_veth_interface_status(settings.CONFIG)
-        calls = [call("get", index="dev1"), call("get", index="dev2"), call("get", index="eth0")]
-        self.iproute_obj.link.assert_has_calls(calls)
+        self.iproute_obj.get_links.assert_called_once_with()
+        self.assertFalse(self.iproute_obj.link.called)
 
     def test_show_vnet_veth_interface_status_calls_tabulate(self):
         show_vnet_veth_interface_status(settings.CONFIG)
         self.tabulate.assert_called_once_with(
-            [["vnet-veth1", "up", "mac", "peer", "peer"], ["vnet-veth0", "up", "mac", "peer", "peer"]],
+            [["vnet-veth1", "down", "mac1", "vnet-veth0", "vnet-br1"], ["vnet-veth0", "up", "mac0", "vnet-veth1", "vnet-br0"]],
             headers=["Name", "Status", "L2_addr", "Peer", "Master"],
             tablefmt="pretty",
         )
 
     def test_show_vnet_veth_interface_status_calls_tabulate_when_dev_does_not_exist(self):
-        self.iproute_obj.link_lookup.return_value = []
+        self.iproute_obj.get_links.return_value = []
         show_vnet_veth_interface_status(settings.CONFIG)
         self.tabulate.assert_called_once_with(
             [["vnet-veth1", "NA", "NA", "NA", "vnet-br1"], ["vnet-veth0", "NA", "NA", "NA", "vnet-br0"]],
@@ -171,22 +207,101 @@ class TestShowVNetVethInterfaceStatus(VNetTestCase):
         )
 
 
-class TestCheckIfInterfaceExists(VNetTestCase):
+class TestGetLinkAttrs(VNetTestCase):
+    def test_get_link_attrs_returns_the_attributes_by_name(self):
+        link = {"index": 1, "attrs": [("IFLA_IFNAME", "lo"), ("IFLA_ADDRESS", "00:00:00:00:00:00")]}
+        self.assertEqual(get_link_attrs(link), {"IFLA_IFNAME": "lo", "IFLA_ADDRESS": "00:00:00:00:00:00"})
+
+
+class TestGetBridgeSTPState(VNetTestCase):
+    def setUp(self) -> None:
+        self.info_data = {"attrs": [("IFLA_BR_STP_STATE", 1)]}
+        self.attrs = {"IFLA_LINKINFO": {"attrs": [("IFLA_INFO_KIND", "bridge"), ("IFLA_INFO_DATA", self.info_data)]}}
+
+    def test_get_bridge_stp_state_returns_true_if_stp_is_enabled(self):
+        self.assertTrue(get_bridge_stp_state(self.attrs))
+
+    def test_get_bridge_stp_state_returns_false_if_stp_is_disabled(self):
+        self.info_data["attrs"] = [("IFLA_BR_STP_STATE", 0)]
+        self.assertFalse(get_bridge_stp_state(self.attrs))
+
+    def test_get_bridge_stp_state_returns_false_if_there_is_no_link_info(self):
+        self.assertFalse(get_bridge_stp_state({}))
+
+    def test_get_bridge_stp_state_returns_false_if_there_is_no_info_data(self):
+        self.assertFalse(get_bridge_stp_state({"IFLA_LINKINFO": {"attrs": [("IFLA_INFO_KIND", "veth")]}}))
+
+
+class TestGetLinksByName(VNetTestCase):
     def setUp(self) -> None:
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
-        self.iproute.return_value.link_lookup.return_value = [1]
+        self.links = [{"index": 1, "attrs": [("IFLA_IFNAME", "lo")]}, {"index": 2, "attrs": [("IFLA_IFNAME", "eth0")]}]
+        self.iproute.return_value.get_links.return_value = self.links
+
+    def test_get_links_by_name_dumps_the_links(self):
+        get_links_by_name()
+        self.iproute.return_value.get_links.assert_called_once_with()
+
+    def test_get_links_by_name_returns_the_links_by_interface_name(self):
+        self.assertEqual(get_links_by_name(), {"lo": self.links[0], "eth0": self.links[1]})
+
+    def test_get_links_by_name_uses_passed_iproute(self):
+        ip = Mock()
+        ip.get_links.return_value = self.links
+        get_links_by_name(ip=ip)
+        ip.get_links.assert_called_once_with()
+        self.assertFalse(self.iproute.called)
+
+
+class TestGetLink(VNetTestCase):
+    def setUp(self) -> None:
+        self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
+        self.iproute.return_value.link.return_value = [{"index": 1}]
+
+    def test_get_link_calls_iproute_link_get(self):
+        get_link("dev1")
+        self.iproute.return_value.link.assert_called_once_with("get", ifname="dev1")
+
+    def test_get_link_returns_the_link(self):
+        self.assertEqual(get_link("dev1"), {"index": 1})
 
-    def test_check_if_interface_exists_calls_iproute_lookup(self):
+    def test_get_link_returns_none_if_the_interface_does_not_exist(self):
+        self.iproute.return_value.link.side_effect = NetlinkError(ENODEV)
+        self.assertIsNone(get_link("dev1"))
+
+    def test_get_link_raises_other_netlink_errors(self):
+        self.iproute.return_value.link.side_effect = NetlinkError(EPERM)
+        with self.assertRaises(NetlinkError):
+            get_link("dev1")
+
+    def test_get_link_uses_passed_iproute(self):
+        ip = MagicMock()
+        get_link("dev1", ip=ip)
+        ip.link.assert_called_once_with("get", ifname="dev1")
+        self.assertFalse(self.iproute.called)
+
+
+class TestCheckIfInterfaceExists(VNetTestCase):
+    def setUp(self) -> None:
+        self.get_link = self.set_up_patch("vnet_manager.operations.interface.get_link")
+        self.get_link.return_value = {"index": 1}
+
+    def test_check_if_interface_exists_calls_get_link(self):
         check_if_interface_exists("dev1")
-        self.iproute.return_value.link_lookup.assert_called_once_with(ifname="dev1")
+        self.get_link.assert_called_once_with("dev1", ip=None)
 
     def test_check_if_interface_exists_returns_true_if_it_exists(self):
         self.assertTrue(check_if_interface_exists("dev1"))
 
     def test_check_if_interface_exists_returns_false_if_it_does_not_exist(self):
-        self.iproute.return_value.link_lookup.return_value = []
+        self.get_link.return_value = None
         self.assertFalse(check_if_interface_exists("dev1"))
 
+    def test_check_if_interface_exists_uses_passed_iproute(self):
+        ip = Mock()
+        check_if_interface_exists("dev1", ip=ip)
+        self.get_link.assert_called_once_with("dev1", ip=ip)
+
 
 class TestCreateVNetInterface(VNetTestCase):
     def setUp(self) -> None:
@@ -199,7 +314,14 @@ class TestCreateVNetInterface(VNetTestCase):
 
     def test_create_vnet_interface_calls_configure_vnet_interface(self):
         create_vnet_interface("dev1")
-        self.configure_int.assert_called_once_with("dev1")
+        self.configure_int.assert_called_once_with("dev1", ip=self.iproute.return_value)
+
+    def test_create_vnet_interface_uses_passed_iproute(self):
+        ip = Mock()
+        create_vnet_interface("dev1", ip=ip)
+        ip.link.assert_called_once_with("add", ifname="dev1", kind="bridge")
+        self.configure_int.assert_called_once_with("dev1", ip=ip)
+        self.assertFalse(self.iproute.called)
 
 
 class TestCreateVethInterface(VNetTestCase):
@@ -215,31 +337,67 @@ class TestCreateVethInterface(VNetTestCase):
         self.assertFalse(self.iproute.return_value.link.called)
 
 
+class TestGetIPtablesFilterRules(VNetTestCase):
+    def setUp(self) -> None:
+        self.check_output = self.set_up_patch("vnet_manager.operations.interface.check_output")
+        self.check_output.return_value = b"*filter\n:OUTPUT ACCEPT [0:0]\n-A OUTPUT -o dev1 -j DROP\nCOMMIT\n"
+        self.logger = self.set_up_patch("vnet_manager.operations.interface.logger")
+
+    def test_get_iptables_filter_rules_calls_iptables_save(self):
+        get_iptables_filter_rules()
+        self.check_output.assert_called_once_with(["iptables-save", "-t", "filter"], stderr=DEVNULL)
+
+    def test_get_iptables_filter_rules_returns_the_rules(self):
+        self.assertIn("-A OUTPUT -o dev1 -j DROP", get_iptables_filter_rules())
+
+    def test_get_iptables_filter_rules_logs_error_and_returns_no_rules_if_iptables_save_fails(self):
+        self.check_output.side_effect = CalledProcessError(1, "test")
+        self.assertEqual(get_iptables_filter_rules(), set())
+        self.logger.error.assert_called_once_with("Unable to get the current IPtables rules, got output: %s", None)
+
+
 class TestCreateVNetInterfaceIPtablesDropRules(VNetTestCase):
     def setUp(self) -> None:
-        self.check_call = self.set_up_patch("vnet_manager.operations.interface.check_call")
-        self.check_call.side_effect = [CalledProcessError(1, "test"), 0]
+        self.get_rules = self.set_up_patch("vnet_manager.operations.interface.get_iptables_filter_rules")
+        self.get_rules.return_value = set()
+        self.check_output = self.set_up_patch("vnet_manager.operations.interface.check_output")
         self.logger = self.set_up_patch("vnet_manager.operations.interface.logger")
 
-    def test_create_vnet_interface_iptables_drop_rules_makes_correct_check_call_calls(self):
-        calls = [
-            call(shlex.split("iptables -C OUTPUT -o dev1 -j DROP"), stderr=DEVNULL),
-            call(shlex.split("iptables -A OUTPUT -o dev1 -j DROP")),
-        ]
-        create_vnet_interface_iptables_rules("dev1")
-        self.check_call.assert_has_calls(calls)
-        self.logger.info.assert_called_once_with("Creating IPtables DROP rule to the outside world for VNet interface dev1")
+    def test_create_vnet_interface_iptables_drop_rules_reads_the_existing_rules_once(self):
+        create_vnet_interface_iptables_rules(["dev1", "dev2"])
+        self.get_rules.assert_called_once_with()
+
+    def test_create_vnet_interface_iptables_drop_rules_adds_all_missing_rules_with_one_restore(self):
+        create_vnet_interface_iptables_rules(["dev1", "dev2"])
+        self.check_output.assert_called_once_with(
+            ["iptables-restore", "--noflush"],
+            input=b"*filter\n-A OUTPUT -o dev1 -j DROP\n-A OUTPUT -o dev2 -j DROP\nCOMMIT\n",
+            stderr=STDOUT,
+        )
+        self.logger.info.assert_has_calls(
+            [
+                call("Creating IPtables DROP rule to the outside world for VNet interface %s", "dev1"),
+                call("Creating IPtables DROP rule to the outside world for VNet interface %s", "dev2"),
+            ]
+        )
+
+    def test_create_vnet_interface_iptables_drop_rules_only_adds_missing_rules(self):
+        self.get_rules.return_value = {"-A OUTPUT -o dev1 -j DROP"}
+        create_vnet_interface_iptables_rules(["dev1", "dev2"])
+        self.check_output.assert_called_once_with(
+            ["iptables-restore", "--noflush"], input=b"*filter\n-A OUTPUT -o dev2 -j DROP\nCOMMIT\n", stderr=STDOUT
+        )
+        self.logger.debug.assert_called_once_with("IPtables DROP rule for VNet interface %s already exists, skipping creation", "dev1")
 
     def test_create_vnet_interface_iptables_drop_rules_does_not_add_rules_if_they_already_exist(self):
-        self.check_call.side_effect = [0, 0]
-        create_vnet_interface_iptables_rules("dev1")
-        self.check_call.assert_called_once_with(shlex.split("iptables -C OUTPUT -o dev1 -j DROP"), stderr=DEVNULL)
-        self.logger.debug.assert_called_once_with("IPtables DROP rule for VNet interface dev1 already exists, skipping creation")
+        self.get_rules.return_value = {"-A OUTPUT -o dev1 -j DROP"}
+        create_vnet_interface_iptables_rules(["dev1"])
+        self.assertFalse(self.check_output.called)
 
-    def test_create_vnet_interface_iptables_drop_rules_logs_error_if_both_commands_fail(self):
-        self.check_call.side_effect = [CalledProcessError(1, "test"), CalledProcessError(1, "test")]
-        create_vnet_interface_iptables_rules("dev1")
-        self.logger.error.assert_called_once_with("Unable to create IPtables rule, got output: None")
+    def test_create_vnet_interface_iptables_drop_rules_logs_error_if_restore_fails(self):
+        self.check_output.side_effect = CalledProcessError(1, "test", output=b"error")
+        create_vnet_interface_iptables_rules(["dev1"])
+        self.logger.error.assert_called_once_with("Unable to create IPtables rules, got output: %s", b"error")
 
 
 class TestConfigureVNetInterface(VNetTestCase):
@@ -247,7 +405,7 @@ class TestConfigureVNetInterface(VNetTestCase):
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute_obj = Mock()
         self.iproute.return_value = self.iproute_obj
-        self.iproute_obj.link_lookup.return_value = [1]
+        self.iproute_obj.link.return_value = [{"index": 1}]
         self.rand_mac = self.set_up_patch("vnet_manager.operations.interface.random_mac_generator")
 
     def test_configure_vnet_interfaces_calls_ip_route(self):
@@ -256,7 +414,7 @@ class TestConfigureVNetInterface(VNetTestCase):
 
     def test_configure_vnet_interface_looks_up_passed_interface(self):
         configure_vnet_interface("test")
-        self.iproute_obj.link_lookup.assert_called_once_with(ifname="test")
+        self.iproute_obj.link.assert_any_call("get", ifname="test")
 
     def test_configure_vnet_interface_calls_random_mac_generator(self):
         configure_vnet_interface("test")
@@ -264,12 +422,11 @@ class TestConfigureVNetInterface(VNetTestCase):
 
     def test_configure_vnet_interface_makes_correct_ip_set_calls(self):
         calls = [
-            call("set", index=1, state="down"),
-            call("set", index=1, address=self.rand_mac.return_value),
-            call("set", index=1, state="up"),
+            call("get", ifname="test"),
+            call("set", index=1, address=self.rand_mac.return_value, state="up"),
         ]
         configure_vnet_interface("test")
-        self.iproute_obj.link.assert_has_calls(calls)
+        self.assertEqual(self.iproute_obj.link.call_args_list, calls)
 
 
 class TestConfigureVethInterface(VNetTestCase):
@@ -277,21 +434,25 @@ class TestConfigureVethInterface(VNetTestCase):
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute_obj = Mock()
         self.iproute.return_value = self.iproute_obj
-        self.iproute_obj.link_lookup.side_effect = [[1], [2]]
+        self.iproute_obj.link.side_effect = [[{"index": 1}], [{"index": 2}], None, None]
         self.data = settings.CONFIG["veths"]["vnet-veth1"]
+        self.rand_mac = self.set_up_patch("vnet_manager.operations.interface.random_mac_generator")
 
     def test_configure_veth_interface_calls_ip_route(self):
         configure_veth_interface("test", self.data)
         self.iproute.assert_called_once_with()
 
     def test_configure_veth_interface_makes_correct_ip_lookup_calls(self):
-        calls = [call(ifname="test"), call(ifname=settings.CONFIG["veths"]["vnet-veth1"]["bridge"])]
+        calls = [call("get", ifname="test"), call("get", ifname=settings.CONFIG["veths"]["vnet-veth1"]["bridge"])]
         configure_veth_interface("test", self.data)
-        self.iproute_obj.link_lookup.assert_has_calls(calls)
+        self.iproute_obj.link.assert_has_calls(calls)
 
-    def test_configure_veth_interface_calls_ip_link(self):
+    def test_configure_veth_interface_makes_correct_ip_set_calls(self):
         configure_veth_interface("test", self.data)
-        self.iproute_obj.link.assert_called_once_with("set", index=1, master=2)
+        self.assertEqual(
+            self.iproute_obj.link.call_args_list[2:],
+            [call("set", index=1, address=self.rand_mac.return_value, state="up", master=2)],
+        )
 
 
 class TestBringUpVNetInterfaces(VNetTestCase):
@@ -305,12 +466,13 @@ class TestBringUpVNetInterfaces(VNetTestCase):
         self.check_if_interface_exists.return_value = False
         self.create_vnet_interface = self.set_up_patch("vnet_manager.operations.interface.create_vnet_interface")
         self.create_vnet_interface_block_rules = self.set_up_patch("vnet_manager.operations.interface.create_vnet_interface_iptables_rules")
-        self.check_if_sniffer_exists = self.set_up_patch("vnet_manager.operations.interface.check_if_sniffer_exists")
-        self.check_if_sniffer_exists.return_value = False
+        self.sniffed = self.set_up_patch("vnet_manager.operations.interface.get_sniffed_interface_names")
+        self.sniffed.return_value = set()
         self.start_tcpdump_on_interface = self.set_up_patch("vnet_manager.operations.interface.start_tcpdump_on_vnet_interface")
         self.ensure_vnet_veth_interfaces = self.set_up_patch("vnet_manager.operations.interface.ensure_vnet_veth_interfaces")
         self.config = deepcopy(settings.CONFIG)
         self.expected_vnet_interface_calls = [call(i) for i in self.get_vnet_interface_names.return_value]
+        self.expected_vnet_interface_calls_with_ip = [call(i, ip=self.iproute_obj) for i in self.get_vnet_interface_names.return_value]
 
     def test_bring_up_vnet_interfaces_calls_ip_route(self):
         bring_up_vnet_interfaces(self.config)
@@ -322,20 +484,20 @@ class TestBringUpVNetInterfaces(VNetTestCase):
 
     def test_bring_up_vnet_interfaces_calls_check_if_interface_exists_with_interface_names(self):
         bring_up_vnet_interfaces(self.config)
-        self.check_if_interface_exists.assert_has_calls(self.expected_vnet_interface_calls)
+        self.check_if_interface_exists.assert_has_calls(self.expected_vnet_interface_calls_with_ip)
 
     def test_bring_up_vnet_interfaces_calls_create_vnet_interface_with_interface_names(self):
         bring_up_vnet_interfaces(self.config)
-        self.create_vnet_interface.assert_has_calls(self.expected_vnet_interface_calls)
+        self.create_vnet_interface.assert_has_calls(self.expected_vnet_interface_calls_with_ip)
 
     def test_bring_up_vnet_interfaces_does_not_call_create_interface_if_the_interface_already_exists(self):
         self.check_if_interface_exists.return_value = True
         bring_up_vnet_interfaces(self.config)
         self.assertFalse(self.create_vnet_interface.called)
 
-    def test_bring_up_vnet_interfaces_calls_create_vnet_interface_iptables_rules(self):
+    def test_bring_up_vnet_interfaces_calls_create_vnet_interface_iptables_rules_once(self):
         bring_up_vnet_interfaces(self.config)
-        self.create_vnet_interface_block_rules.assert_has_calls(self.expected_vnet_interface_calls)
+        self.create_vnet_interface_block_rules.assert_called_once_with(self.get_vnet_interface_names.return_value)
 
     def test_bring_up_vnet_interfaces_calls_ip_link_to_bring_up_interfaces(self):
         calls = [call("set", ifname=i, state="up") for i in self.get_vnet_interface_names.return_value]
@@ -350,22 +512,28 @@ class TestBringUpVNetInterfaces(VNetTestCase):
         bring_up_vnet_interfaces(self.config, sniffer=True)
         self.start_tcpdump_on_interface.assert_has_calls([call(ifname=i, path="/tmp") for i in self.get_vnet_interface_names.return_value])
 
-    def test_bring_up_vnet_interfaces_calls_check_if_sniffer_exists(self):
+    def test_bring_up_vnet_interfaces_scans_for_sniffers_once(self):
         bring_up_vnet_interfaces(self.config, sniffer=True)
-        self.check_if_sniffer_exists.assert_has_calls(self.expected_vnet_interface_calls)
+        self.sniffed.assert_called_once_with()
+
+    def test_bring_up_vnet_interfaces_does_not_scan_for_sniffers_by_default(self):
+        bring_up_vnet_interfaces(self.config)
+        self.assertFalse(self.sniffed.called)
 
     def test_bring_up_vnet_interfaces_does_not_call_start_sniffer_when_the_sniffer_already_exists(self):
-        self.check_if_sniffer_exists.return_value = True
+        self.sniffed.return_value = set(self.get_vnet_interface_names.return_value)
         bring_up_vnet_interfaces(self.config, sniffer=True)
         self.assertFalse(self.start_tcpdump_on_interface.called)
 
     def test_bring_up_vnet_interfaces_calls_ensure_vnet_veth_interfaces_with_default_values(self):
         bring_up_vnet_interfaces(self.config)
-        self.ensure_vnet_veth_interfaces.assert_called_once_with(config=self.config, sniffer=False, pcap_dir=settings.VNET_SNIFFER_PCAP_DIR)
+        self.ensure_vnet_veth_interfaces.assert_called_once_with(
+            config=self.config, sniffer=False, pcap_dir=settings.VNET_SNIFFER_PCAP_DIR, ip=self.iproute_obj
+        )
 
     def test_bring_up_vnet_interfaces_calls_ensure_vnet_veth_interfaces_with_sniffer(self):
         bring_up_vnet_interfaces(self.config, sniffer=True, pcap_dir="/test")
-        self.ensure_vnet_veth_interfaces.assert_called_once_with(config=self.config, sniffer=True, pcap_dir="/test")
+        self.ensure_vnet_veth_interfaces.assert_called_once_with(config=self.config, sniffer=True, pcap_dir="/test", ip=self.iproute_obj)
 
     def test_bring_up_vnet_interfaces_does_not_calls_ensure_vnet_veth_interface_if_no_veth_interfaces_present_in_config(self):
         del self.config["veths"]
@@ -376,41 +544,48 @@ class TestBringUpVNetInterfaces(VNetTestCase):
 class TestEnsureVNetVethInterfaces(VNetTestCase):
     def setUp(self) -> None:
         self.config = deepcopy(settings.CONFIG)
-        self.ndb = self.set_up_patch("vnet_manager.operations.interface.NDB", themock=MagicMock())
+        self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.check_if_interface_exists = self.set_up_patch("vnet_manager.operations.interface.check_if_interface_exists")
         self.check_if_interface_exists.return_value = False
         self.create_veth_interface = self.set_up_patch("vnet_manager.operations.interface.create_veth_interface")
         self.configure_veth_interface = self.set_up_patch("vnet_manager.operations.interface.configure_veth_interface")
-        self.configure_vnet_interface = self.set_up_patch("vnet_manager.operations.interface.configure_vnet_interface")
         self.start_tcpdump = self.set_up_patch("vnet_manager.operations.interface.start_tcpdump_on_vnet_interface")
+        self.sniffed = self.set_up_patch("vnet_manager.operations.interface.get_sniffed_interface_names")
+        self.sniffed.return_value = set()
 
-    def test_ensure_vnet_veth_interfaces_calls_ndb(self):
+    def test_ensure_vnet_veth_interfaces_calls_iproute_once(self):
         ensure_vnet_veth_interfaces(self.config)
-        self.ndb.assert_called_with(log=False)
+        self.iproute.assert_called_once_with()
 
-    def test_ensure_vnet_veth_interfaces_set_stp_state_to_correct_state_according_to_config(self):
-        ensure_vnet_veth_interfaces(self.config)
-        calls = [call("vnet-br1"), call("vnet-br0")]
-        self.assertIn(calls, self.ndb.return_value.interfaces.__getitem__.call_args_list)
+    def test_ensure_vnet_veth_interfaces_uses_passed_iproute(self):
+        ip = Mock()
+        ensure_vnet_veth_interfaces(self.config, ip=ip)
+        self.assertFalse(self.iproute.called)
+        self.configure_veth_interface.assert_has_calls([call(k, v, ip=ip) for k, v in self.config["veths"].items()])
 
-    def test_ensure_vnet_veth_interfaces_does_not_call_ndb_if_stp_not_in_int_data(self):
-        del self.config["veths"]["vnet-veth1"]["stp"]
+    def test_ensure_vnet_veth_interfaces_sets_correct_stp_state_on_bridge_ints(self):
         ensure_vnet_veth_interfaces(self.config)
-        self.assertNotIn(call("vnet-br1"), self.ndb.return_value.interfaces.__getitem__.call_args_list)
+        self.assertEqual(
+            self.iproute.return_value.link.call_args_list,
+            [
+                call("set", ifname="vnet-br1", kind="bridge", br_stp_state=1),
+                call("set", ifname="vnet-br0", kind="bridge", br_stp_state=0),
+            ],
+        )
 
-    def test_ensure_vnet_veth_interfaces_sets_correct_stp_state_on_bridge_ints(self):
+    def test_ensure_vnet_veth_interfaces_does_not_set_stp_state_if_stp_not_in_int_data(self):
+        del self.config["veths"]["vnet-veth1"]["stp"]
         ensure_vnet_veth_interfaces(self.config)
-        calls = [call("br_stp_state", 1), call("br_stp_state", 0)]
-        self.assertIn(calls, self.ndb.return_value.interfaces.__getitem__.return_value.__enter__.return_value.set.call_args_list)
+        self.iproute.return_value.link.assert_called_once_with("set", ifname="vnet-br0", kind="bridge", br_stp_state=0)
 
     def test_ensure_vnet_veth_interfaces_checks_if_veth_interfaces_already_exist(self):
         ensure_vnet_veth_interfaces(self.config)
-        calls = [call(i) for i in self.config["veths"]]
+        calls = [call(i, ip=self.iproute.return_value) for i in self.config["veths"]]
         self.check_if_interface_exists.assert_has_calls(calls)
 
     def test_ensure_vnet_veth_interfaces_calls_create_veth_interfaces(self):
         ensure_vnet_veth_interfaces(self.config)
-        calls = [call(k, v) for k, v in self.config["veths"].items()]
+        calls = [call(k, v, ip=self.iproute.return_value) for k, v in self.config["veths"].items()]
         self.create_veth_interface.assert_has_calls(calls)
 
     def test_ensure_vnet_veth_interfaces_does_not_call_create_interfaces_if_they_already_exist(self):
@@ -419,13 +594,13 @@ class TestEnsureVNetVethInterfaces(VNetTestCase):
 
     def test_ensure_vnet_veth_interfaces_calls_configure_veth_interface(self):
         ensure_vnet_veth_interfaces(self.config)
-        calls = [call(k, v) for k, v in self.config["veths"].items()]
+        calls = [call(k, v, ip=self.iproute.return_value) for k, v in self.config["veths"].items()]
         self.configure_veth_interface.assert_has_calls(calls)
 
-    def test_ensure_vnet_veth_interfaces_calls_configure_vnet_interface(self):
+    def test_ensure_vnet_veth_interfaces_does_not_call_configure_vnet_interface(self):
+        configure_vnet_interface = self.set_up_patch("vnet_manager.operations.interface.configure_vnet_interface")
         ensure_vnet_veth_interfaces(self.config)
-        calls = [call(i) for i in self.config["veths"]]
-        self.configure_vnet_interface.assert_has_calls(calls)
+        self.assertFalse(configure_vnet_interface.called)
 
     def test_ensure_vnet_veth_interfaces_does_not_start_sniffers_by_default(self):
         ensure_vnet_veth_interfaces(self.config)
@@ -436,24 +611,62 @@ class TestEnsureVNetVethInterfaces(VNetTestCase):
         calls = [call(ifname=i, path=settings.VNET_SNIFFER_PCAP_DIR) for i in self.config["veths"]]
         self.start_tcpdump.assert_has_calls(calls)
 
+    def test_ensure_vnet_veth_interfaces_scans_for_sniffers_once(self):
+        ensure_vnet_veth_interfaces(self.config, sniffer=True)
+        self.sniffed.assert_called_once_with()
+
+    def test_ensure_vnet_veth_interfaces_does_not_start_sniffers_that_already_exist(self):
+        self.sniffed.return_value = {"vnet-veth0"}
+        ensure_vnet_veth_interfaces(self.config, sniffer=True)
+        self.start_tcpdump.assert_called_once_with(ifname="vnet-veth1", path=settings.VNET_SNIFFER_PCAP_DIR)
+
     def test_ensure_vnet_veth_interfaces_call_start_tcpdump_on_sniffer_with_custom_path(self):
         ensure_vnet_veth_interfaces(self.config, sniffer=True, pcap_dir="/test")
         calls = [call(ifname=i, path="/test") for i in self.config["veths"]]
         self.start_tcpdump.assert_has_calls(calls)
 
 
+class TestGetSniffedInterfaceName(VNetTestCase):
+    def test_get_sniffed_interface_name_returns_the_sniffed_interface(self):
+        self.assertEqual(get_sniffed_interface_name(["/usr/sbin/tcpdump", "-i", "dev1", "-n"]), "dev1")
+
+    def test_get_sniffed_interface_name_returns_none_for_other_processes(self):
+        self.assertIsNone(get_sniffed_interface_name(["testprocess", "-i", "dev1"]))
+
+    def test_get_sniffed_interface_name_returns_none_if_no_interface_is_passed(self):
+        self.assertIsNone(get_sniffed_interface_name(["tcpdump", "-n", "-i"]))
+
+    def test_get_sniffed_interface_name_returns_none_for_an_unknown_cmdline(self):
+        self.assertIsNone(get_sniffed_interface_name(None))
+
+
+class TestGetSniffedInterfaceNames(VNetTestCase):
+    def setUp(self) -> None:
+        self.process_iter = self.set_up_patch("psutil.process_iter")
+        self.process_iter.return_value = [
+            Mock(info={"cmdline": ["/usr/sbin/tcpdump", "-i", "dev1", "-n"]}),
+            Mock(info={"cmdline": ["testprocess", "testargs"]}),
+            Mock(info={"cmdline": None}),
+            Mock(info={"cmdline": ["tcpdump", "-i", "dev2", "-U", "-w", "/tmp/dev2.pcap"]}),
+        ]
+
+    def test_get_sniffed_interface_names_scans_the_process_table_once(self):
+        get_sniffed_interface_names()
+        self.process_iter.assert_called_once_with(["cmdline"])
+
+    def test_get_sniffed_interface_names_returns_the_sniffed_interfaces(self):
+        self.assertEqual(get_sniffed_interface_names(), {"dev1", "dev2"})
+
+
 class TestCheckIfSnifferExists(VNetTestCase):
     def setUp(self) -> None:
-        self.process = Mock()
-        self.process_iter = self.set_up_patch("vnet_manager.operations.interface.process_iter")
-        self.process_iter.return_value = [self.process]
-        self.process.cmdline.return_value = "testprocess testargs"
+        self.sniffed = self.set_up_patch("vnet_manager.operations.interface.get_sniffed_interface_names")
+        self.sniffed.return_value = {"dev1"}
 
     def test_check_if_sniffer_exists_returns_false_if_sniffer_does_not_exist(self):
         self.assertFalse(check_if_sniffer_exists("dev0"))
 
     def test_check_if_sniffer_exists_returns_true_if_sniffer_exists(self):
-        self.process.cmdline.return_value = "/usr/sbin/tcpdump -i dev1 -n"
         self.assertTrue(check_if_sniffer_exists("dev1"))
 
 
@@ -462,27 +675,27 @@ class TestBringDownVNetInterfaces(VNetTestCase):
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute_obj = Mock()
         self.iproute.return_value = self.iproute_obj
-        self.check_if_interface_exists = self.set_up_patch("vnet_manager.operations.interface.check_if_interface_exists")
-        self.check_if_sniffer_exsits = self.set_up_patch("vnet_manager.operations.interface.check_if_sniffer_exists")
-        self.check_if_sniffer_exsits.return_value = False
+        self.get_links = self.set_up_patch("vnet_manager.operations.interface.get_links_by_name")
+        self.get_links.return_value = dict.fromkeys(["vnet-veth1", "vnet-veth0", "vnet-br0", "vnet-br1"], {})
+        self.sniffed = self.set_up_patch("vnet_manager.operations.interface.get_sniffed_interface_names")
+        self.sniffed.return_value = set()
         self.config = deepcopy(settings.CONFIG)
 
     def test_bring_down_vnet_interfaces_calls_iproute(self):
         bring_down_vnet_interfaces(self.config)
         self.iproute.assert_called_once_with()
 
-    def test_bring_down_vnet_interfaces_check_if_interface_exists_for_each_interface_in_config(self):
-        calls = [call("vnet-veth1"), call("vnet-veth0"), call("vnet-br0"), call("vnet-br1")]
+    def test_bring_down_vnet_interfaces_dumps_the_links_once(self):
         bring_down_vnet_interfaces(self.config)
-        self.check_if_interface_exists.assert_has_calls(calls)
-        self.assertEqual(self.check_if_interface_exists.call_count, 4)
+        self.get_links.assert_called_once_with(ip=self.iproute_obj)
 
-    def test_bring_down_vnet_interfaces_does_not_check_veth_interfaces_if_not_in_config(self):
-        calls = [call("vnet-br0"), call("vnet-br1")]
-        del self.config["veths"]
+    def test_bring_down_vnet_interfaces_only_brings_down_interfaces_that_exist(self):
+        self.get_links.return_value = dict.fromkeys(["vnet-veth0", "vnet-br1"], {})
         bring_down_vnet_interfaces(self.config)
-        self.check_if_interface_exists.assert_has_calls(calls)
-        self.assertEqual(self.check_if_interface_exists.call_count, 2)
+        self.assertEqual(
+            self.iproute_obj.link.call_args_list,
+            [call("set", ifname="vnet-veth0", state="down"), call("set", ifname="vnet-br1", state="down")],
+        )
 
     def test_bring_down_vnet_interfaces_calls_ip_link_to_bring_down_interfaces(self):
         calls = [call("set", ifname=i, state="down") for i in ["vnet-veth1", "vnet-veth0", "vnet-br0", "vnet-br1"]]
@@ -498,7 +711,7 @@ class TestBringDownVNetInterfaces(VNetTestCase):
         self.assertEqual(self.iproute_obj.link.call_count, 2)
 
     def test_bring_down_vnet_interfaces_does_nothing_if_interfaces_do_not_exist(self):
-        self.check_if_interface_exists.return_value = False
+        self.get_links.return_value = {}
         bring_down_vnet_interfaces(self.config)
         self.assertFalse(self.iproute_obj.link.called)
 
@@ -506,16 +719,21 @@ class TestBringDownVNetInterfaces(VNetTestCase):
         self.assertFalse(bring_down_vnet_interfaces(self.config))
 
     def test_bring_down_vnet_interfaces_returns_true_if_sniffers_exist(self):
-        self.check_if_sniffer_exsits.return_value = True
+        self.sniffed.return_value = {"vnet-br1"}
         self.assertTrue(bring_down_vnet_interfaces(self.config))
 
+    def test_bring_down_vnet_interfaces_scans_for_sniffers_once(self):
+        bring_down_vnet_interfaces(self.config)
+        self.sniffed.assert_called_once_with()
+
 
 class TestDeleteVNetInterfaces(VNetTestCase):
     def setUp(self) -> None:
         self.iproute = self.set_up_patch("vnet_manager.operations.interface.IPRoute")
         self.iproute_obj = Mock()
         self.iproute.return_value = self.iproute_obj
-        self.check_if_interface_exists = self.set_up_patch("vnet_manager.operations.interface.check_if_interface_exists")
+        self.get_links = self.set_up_patch("vnet_manager.operations.interface.get_links_by_name")
+        self.get_links.return_value = dict.fromkeys(["vnet-veth1", "vnet-veth0", "vnet-br0", "vnet-br1"], {})
         self.config = deepcopy(settings.CONFIG)
 
     def test_delete_vnet_interfaces_calls_iproute(self):
@@ -523,22 +741,18 @@ class TestDeleteVNetInterfaces(VNetTestCase):
         self.iproute.assert_called_once_with()
 
     def test_delete_vnet_interfaces_does_nothing_if_interfaces_do_not_exist(self):
-        self.check_if_interface_exists.return_value = False
+        self.get_links.return_value = {}
         delete_vnet_interfaces(self.config)
         self.assertFalse(self.iproute_obj.link.called)
 
-    def test_delete_vnet_interfaces_check_if_interface_exists_for_each_interface_in_config(self):
-        calls = [call("vnet-veth0"), call("vnet-br0"), call("vnet-br1")]
+    def test_delete_vnet_interfaces_dumps_the_links_once(self):
         delete_vnet_interfaces(self.config)
-        self.check_if_interface_exists.assert_has_calls(calls)
-        self.assertEqual(self.check_if_interface_exists.call_count, 3)
+        self.get_links.assert_called_once_with(ip=self.iproute_obj)
 
-    def test_delete_vnet_interfaces_does_not_check_veth_interfaces_if_not_in_config(self):
-        calls = [call("vnet-br0"), call("vnet-br1")]
-        del self.config["veths"]
+    def test_delete_vnet_interfaces_only_deletes_interfaces_that_exist(self):
+        self.get_links.return_value = dict.fromkeys(["vnet-veth1", "vnet-br1"], {})
         delete_vnet_interfaces(self.config)
-        self.check_if_interface_exists.assert_has_calls(calls)
-        self.assertEqual(self.check_if_interface_exists.call_count, 2)
+        self.iproute_obj.link.assert_called_once_with("del", ifname="vnet-br1")
 
     def test_delete_vnet_interfaces_calls_ip_link_to_delete_interfaces(self):
         calls = [call("del", ifname=i) for i in ["vnet-veth0", "vnet-br0", "vnet-br1"]]
@@ -546,6 +760,12 @@ class TestDeleteVNetInterfaces(VNetTestCase):
         self.iproute_obj.link.assert_has_calls(calls)
         self.assertEqual(self.iproute_obj.link.call_count, 3)
 
+    def test_delete_vnet_interfaces_deletes_a_veth_pair_once_if_both_ends_define_a_peer(self):
+        self.config["veths"] = {"vnet-veth0": {"peer": "vnet-veth1"}, "vnet-veth1": {"peer": "vnet-veth0"}}
+        delete_vnet_interfaces(self.config)
+        self.iproute_obj.link.assert_any_call("del", ifname="vnet-veth0")
+        self.assertNotIn(call("del", ifname="vnet-veth1"), self.iproute_obj.link.call_args_list)
+
     def test_delete_vnet_interfaces_down_not_delete_veth_interfaces_if_not_in_config(self):
         calls = [call("del", ifname=i) for i in ["vnet-br0", "vnet-br1"]]
         del self.config["veths"]
@@ -560,27 +780,35 @@ class TestStartTcpdumpOnVNetInterface(VNetTestCase):
 
     def test_start_tcpdump_on_vnet_interface_makes_correct_popen_call(self):
         start_tcpdump_on_vnet_interface("dev1")
-        self.popen.assert_called_once_with(ANY)
+        self.popen.assert_called_once_with(["tcpdump", "-i", "dev1", "-U", "-w", ANY], stdin=DEVNULL, stdout=DEVNULL)
+
+    def test_start_tcpdump_on_vnet_interface_writes_pcap_to_path(self):
+        start_tcpdump_on_vnet_interface("dev1", path="/test")
+        self.assertRegex(self.popen.call_args[0][0][-1], r"^/test/dev1\.\d{10}\.pcap$")
 
 
 class TestKillTCPDumpProcessesOnVNetInterfaces(VNetTestCase):
     def setUp(self) -> None:
         self.config = deepcopy(settings.CONFIG)
         self.process = Mock()
-        self.process_iter = self.set_up_patch("vnet_manager.operations.interface.process_iter")
+        self.process_iter = self.set_up_patch("psutil.process_iter")
         self.process_iter.return_value = [self.process]
-        self.process.cmdline.return_value = "testprocess testargs"
+        self.process.info = {"cmdline": ["testprocess", "testargs"]}
 
     def test_kill_tcpdump_processes_on_vnet_interfaces_doesnt_kill_anything_if_no_interfaces_found(self):
         kill_tcpdump_processes_on_vnet_interfaces(self.config)
         self.assertFalse(self.process.kill.called)
 
+    def test_kill_tcpdump_processes_on_vnet_interfaces_scans_the_process_table_once(self):
+        kill_tcpdump_processes_on_vnet_interfaces(self.config)
+        self.process_iter.assert_called_once_with(["cmdline"])
+
     def test_kill_tcpdump_processes_on_vnet_interfaces_kills_tcpdump_process_on_vnet_interface(self):
-        self.process.cmdline.return_value = f"/usr/sbin/tcpdump -i {settings.VNET_BRIDGE_NAME}0 -n"
+        self.process.info = {"cmdline": ["/usr/sbin/tcpdump", "-i", f"{settings.VNET_BRIDGE_NAME}0", "-n"]}
         kill_tcpdump_processes_on_vnet_interfaces(self.config)
         self.process.kill.assert_called_once_with()
 
     def test_kill_tcpdump_processes_on_vnet_interfaces_kills_tcpdump_process_on_vnet_veth_interface(self):
-        self.process.cmdline.return_value = f"/usr/sbin/tcpdump -i vnet-veth0 -n"
+        self.process.info = {"cmdline": ["/usr/sbin/tcpdump", "-i", "vnet-veth0", "-n"]}
         kill_tcpdump_processes_on_vnet_interfaces(self.config)
         self.process.kill.assert_called_once_with()
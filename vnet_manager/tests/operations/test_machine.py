@@ -27,7 +27,7 @@ from vnet_manager.operations.machine import (
 
 class TestShowStatus(VNetTestCase):
     def setUp(self) -> None:
-        self.tabulate = self.set_up_patch("vnet_manager.operations.machine.tabulate")
+        self.tabulate = self.set_up_patch("tabulate.tabulate")
         self.get_lxc_machine_status = self.set_up_patch("vnet_manager.operations.machine.get_lxc_machine_status")
         self.get_lxc_machine_status.return_value = ["router", "up", "LXC"]
         self.config = deepcopy(settings.CONFIG)